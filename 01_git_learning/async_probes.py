@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Параллельный запуск независимых проверок (asyncio)
+Проверки без зависимостей запускаются одновременно, проверка с depends_on
+ждёт завершения тех, от которых зависит. on_start(probe) и
+on_finish(probe, result) вызываются вокруг каждой проверки (result - None,
+если проверка завершилась исключением).
+"""
+import asyncio
+import subprocess
+from collections import namedtuple
+
+# args - список аргументов команды или функция без аргументов
+Probe = namedtuple("Probe", "name args depends_on", defaults=((),))
+
+
+async def _run_command(args, cwd):
+    """Запуск одной команды через create_subprocess_exec"""
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *args,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            cwd=cwd,
+        )
+    except OSError as e:
+        return subprocess.CompletedProcess(args, 127, "", str(e))
+    stdout, stderr = await process.communicate()
+    return subprocess.CompletedProcess(
+        args,
+        process.returncode,
+        stdout.decode("utf-8", errors="replace"),
+        stderr.decode("utf-8", errors="replace"),
+    )
+
+
+async def _run_probe(probe, dependencies, cwd, on_start=None, on_finish=None):
+    """Проверка запускается после завершения своих зависимостей"""
+    if dependencies:
+        await asyncio.gather(*dependencies)
+    if on_start:
+        on_start(probe)
+    result = None
+    try:
+        if callable(probe.args):
+            result = await asyncio.to_thread(probe.args)
+        else:
+            result = await _run_command(probe.args, cwd)
+        return result
+    finally:
+        if on_finish:
+            on_finish(probe, result)
+
+
+async def run_probes_async(probes, cwd=None, on_start=None, on_finish=None):
+    """Запуск проверок; зависимости должны идти в списке раньше зависимых"""
+    tasks = {}
+    for probe in probes:
+        dependencies = [tasks[name] for name in probe.depends_on]
+        tasks[probe.name] = asyncio.ensure_future(_run_probe(probe, dependencies, cwd, on_start, on_finish))
+    results = await asyncio.gather(*tasks.values())
+    return dict(zip(tasks, results))
+
+
+def run_probes(probes, cwd=None, on_start=None, on_finish=None):
+    """Синхронная обёртка: {имя проверки: результат}"""
+    return asyncio.run(run_probes_async(probes, cwd, on_start, on_finish))
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Пакетное создание учебных репозиториев
+Запускает GitLearning без вопросов к пользователю для N студентов
+параллельно (пул процессов или пул потоков), каждый в своей папке.
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+from output_stream import ThreadLocalStdout
+from start_git import GitLearning
+
+
+def prepare_worker():
+    """Подготовка процесса: ветка main по умолчанию и вывод по потокам"""
+    # Учебный курс рассчитан на ветку main
+    os.environ.setdefault("GIT_CONFIG_COUNT", "1")
+    os.environ.setdefault("GIT_CONFIG_KEY_0", "init.defaultBranch")
+    os.environ.setdefault("GIT_CONFIG_VALUE_0", "main")
+    if not isinstance(sys.stdout, ThreadLocalStdout):
+        sys.stdout = ThreadLocalStdout(sys.stdout)
+
+
+def build_repository(base_dir, project_name):
+    """Создание одного репозитория (в отдельном процессе или потоке)"""
+    learning = GitLearning(project_name=project_name, base_dir=base_dir, interactive=False)
+    log_path = os.path.join(base_dir, f"{project_name}.log")
+    started = time.perf_counter()
+    with open(log_path, "w", encoding="utf-8") as log, sys.stdout.redirect(log):
+        learning.run()
+    return {
+        "project": project_name,
+        "seconds": time.perf_counter() - started,
+        "steps_completed": learning.steps_completed,
+        "step_timings": learning.step_timings,
+        "log": log_path,
+    }
+
+
+def run_batch(count, base_dir, workers=None, prefix="student", threads=False):
+    """Создание count репозиториев; возвращает результаты и общее время"""
+    os.makedirs(base_dir, exist_ok=True)
+    base_dir = os.path.abspath(base_dir)
+    results = []
+    if threads:
+        # Все сессии в одном интерпретаторе - os.chdir нигде не используется
+        prepare_worker()
+        pool = ThreadPoolExecutor(max_workers=workers)
+    else:
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=prepare_worker)
+    started = time.perf_counter()
+    with pool:
+        futures = [
+            pool.submit(build_repository, base_dir, f"{prefix}_{i:03d}")
+            for i in range(1, count + 1)
+        ]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            print(f"✅ {result['project']}: {result['seconds']:.2f} с")
+    return results, time.perf_counter() - started
+
+
+def print_report(results, elapsed):
+    """Пропускная способность и среднее время шагов"""
+    print("\n" + "="*60)
+    print("📊 ИТОГИ ПАКЕТНОГО ЗАПУСКА")
+    print("="*60)
+    print(f"  Репозиториев: {len(results)}")
+    print(f"  Общее время: {elapsed:.2f} с")
+    if elapsed > 0:
+        print(f"  Скорость: {len(results) / elapsed * 60:.1f} репозиториев/мин")
+
+    totals = {}
+    for result in results:
+        for name, seconds in result["step_timings"]:
+            totals.setdefault(name, []).append(seconds)
+
+    print("\n⏱️  Среднее время шагов:")
+    for name, values in totals.items():
+        print(f"  {name:<32} {sum(values) / len(values) * 1000:8.1f} мс  (макс {max(values) * 1000:.1f} мс)")
+
+
+def main():
+    """Точка входа"""
+    parser = argparse.ArgumentParser(description="Пакетное создание учебных Git репозиториев")
+    parser.add_argument("count", type=int, help="количество репозиториев")
+    parser.add_argument("--dir", default="students", help="папка для репозиториев")
+    parser.add_argument("--workers", type=int, default=None, help="количество процессов")
+    parser.add_argument("--prefix", default="student", help="префикс имени репозитория")
+    parser.add_argument("--threads", action="store_true",
+                        help="пул потоков в одном процессе вместо пула процессов")
+    args = parser.parse_args()
+
+    results, elapsed = run_batch(args.count, args.dir, args.workers, args.prefix, args.threads)
+    print_report(results, elapsed)
+
+
+if __name__ == "__main__":
+    main()
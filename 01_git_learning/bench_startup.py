@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Замеры времени запуска обучающих скриптов
+Для каждого скрипта: время импорта модуля по данным python -X importtime
+(собственное и накопленное, с самыми тяжёлыми зависимостями) и полное
+время запуска отдельного процесса с командой, которая не требует ввода
+(например, start_git.py --help). Результат можно сохранить в JSON.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+from bench_stats import percentile
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+# {модуль: аргументы запуска, при которых скрипт завершается без ввода}
+DRIVERS = {
+    "start_git": ("--help",),
+    "git_learning_final": None,
+    "git_learning_fixed": None,
+}
+# Сколько самых тяжёлых импортов показывать для каждого скрипта
+TOP_IMPORTS = 5
+
+
+def parse_importtime(stderr):
+    """
+    Строки "import time: self | cumulative | имя" -> [(имя, self, cumulative, глубина)]
+    Время в микросекундах, порядок как в выводе (вложенные модули раньше своего родителя).
+    """
+    timings = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue
+        raw_name = fields[2].rstrip()
+        name = raw_name.lstrip()
+        depth = (len(raw_name) - len(name)) // 2
+        timings.append((name, int(fields[0]), int(fields[1]), depth))
+    return timings
+
+
+def subtree(timings, module):
+    """Модуль и всё, что импортировано при его загрузке: {имя: cumulative}"""
+    for index in range(len(timings) - 1, -1, -1):
+        name, _, cumulative, depth = timings[index]
+        if name == module:
+            break
+    else:
+        raise KeyError(module)
+    modules = {module: cumulative}
+    for name, _, child_cumulative, child_depth in reversed(timings[:index]):
+        if child_depth <= depth:
+            break
+        modules[name] = child_cumulative
+    return modules
+
+
+def measure_import(module):
+    """Время импорта модуля в новом интерпретаторе"""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=SCRIPT_DIR, capture_output=True, text=True, encoding="utf-8", errors="replace",
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Не удалось импортировать {module}:\n{completed.stderr}")
+    return parse_importtime(completed.stderr)
+
+
+def measure_launch(module, args):
+    """Полное время запуска скрипта отдельным процессом, секунды"""
+    started = time.perf_counter()
+    subprocess.run(
+        [sys.executable, os.path.join(SCRIPT_DIR, f"{module}.py"), *args],
+        cwd=SCRIPT_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    return time.perf_counter() - started
+
+
+def bench_driver(module, args, runs):
+    """Сводка по одному скрипту"""
+    imports = []
+    launches = []
+    modules = {}
+    for _ in range(runs):
+        modules = subtree(measure_import(module), module)
+        imports.append(modules[module] / 1_000_000)
+        if args is not None:
+            launches.append(measure_launch(module, args))
+    heaviest = sorted(
+        ((name, cumulative) for name, cumulative in modules.items() if name != module),
+        key=lambda item: item[1], reverse=True,
+    )[:TOP_IMPORTS]
+    return {
+        "name": module,
+        "runs": runs,
+        "import_p50_ms": percentile(imports, 0.50) * 1000,
+        "import_p95_ms": percentile(imports, 0.95) * 1000,
+        "launch_args": list(args) if args is not None else None,
+        "launch_p50_ms": percentile(launches, 0.50) * 1000 if launches else None,
+        "modules": len(modules),
+        "heaviest": [{"name": name, "cumulative_ms": us / 1000} for name, us in heaviest],
+    }
+
+
+def print_report(cases):
+    print("\n" + "="*80)
+    print("🚀 ЗАПУСК СКРИПТОВ")
+    print("="*80)
+    print(f"  {'скрипт':<22} {'импорт p50':>11} {'импорт p95':>11} {'запуск p50':>11} {'модулей':>8}")
+    for case in cases:
+        launch = f"{case['launch_p50_ms']:.1f}" if case["launch_p50_ms"] is not None else "-"
+        print(f"  {case['name']:<22} {case['import_p50_ms']:11.1f} {case['import_p95_ms']:11.1f} "
+              f"{launch:>11} {case['modules']:8}")
+        for item in case["heaviest"]:
+            print(f"      {item['name']:<40} {item['cumulative_ms']:8.1f} мс")
+
+
+def main():
+    """Точка входа"""
+    parser = argparse.ArgumentParser(description="Замеры времени запуска обучающих скриптов Git")
+    parser.add_argument("--runs", type=int, default=10, help="запусков каждого замера")
+    parser.add_argument("--json", help="сохранить результат в JSON")
+    args = parser.parse_args()
+
+    cases = []
+    for module, launch_args in DRIVERS.items():
+        print(f"🧪 {module}...")
+        cases.append(bench_driver(module, launch_args, args.runs))
+    print_report(cases)
+
+    if args.json:
+        report = {
+            "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": sys.platform,
+            "runs": args.runs,
+            "cases": cases,
+        }
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 Результат сохранён: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,14 @@
+#!/usr/bin/env python3
+"""
+Статистика для замеров
+Отдельный модуль без зависимостей: bench_startup не должен загружать
+модули туториала, время запуска которых он измеряет.
+"""
+import math
+
+
+def percentile(values, share):
+    """Перцентиль по ближайшему рангу: ранг share * n, округлённый вверх"""
+    ordered = sorted(values)
+    index = max(0, math.ceil(share * len(ordered)) - 1)
+    return ordered[min(index, len(ordered) - 1)]
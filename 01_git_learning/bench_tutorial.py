@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Замеры производительности обучающих скриптов
+Каждый шаг GitLearning, обёртки команд (run_command, run_command_safe),
+create_files и step_10_summary запускаются несколько раз на тестовых
+репозиториях разного размера. Для каждого замера: p50/p95, число
+запущенных процессов и команд в общей сессии оболочки, пиковая память.
+ru_maxrss - максимум за всё время процесса, поэтому для каждого замера
+показан и его рост во время замера. Результат можно сохранить в JSON
+и сравнить с предыдущим запуском.
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+try:
+    import resource
+except ImportError:
+    # На Windows модуля resource нет - память не измеряется
+    resource = None
+
+import git_learning_final
+import git_resolver
+import shell_session
+from bench_stats import percentile
+from repo_generator import generate
+from start_git import GitLearning
+
+# Размеры тестовых репозиториев (коммитов поверх туториала)
+DEFAULT_SIZES = (0, 1000, 10000)
+# Во сколько раз p50 может вырасти, прежде чем это считается регрессией
+DEFAULT_THRESHOLD = 1.25
+# Команды, которые замеряются на каждом тестовом репозитории
+FIXTURE_COMMANDS = ("git status", "git log --oneline", "git branch", "git rev-list --count HEAD")
+
+
+class SpawnCounter:
+    """
+    Подсчёт запущенных процессов (subprocess, asyncio, запуск оболочки)
+    и команд, выполненных в уже запущенной сессии оболочки (commands)
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.commands = 0
+        self._original = None
+        self._original_stream = None
+
+    def __enter__(self):
+        counter = self
+        self._original = original = subprocess.Popen
+        self._original_stream = original_stream = shell_session.ShellSession.stream
+
+        class CountingPopen(original):
+            def __init__(self, *args, **kwargs):
+                counter.count += 1
+                super().__init__(*args, **kwargs)
+
+        def counting_stream(session, *args, **kwargs):
+            counter.commands += 1
+            return original_stream(session, *args, **kwargs)
+
+        subprocess.Popen = CountingPopen
+        shell_session.ShellSession.stream = counting_stream
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        subprocess.Popen = self._original
+        shell_session.ShellSession.stream = self._original_stream
+
+
+def peak_rss_kb():
+    """Пиковая память процесса и его дочерних процессов с начала работы, КБ (или None)"""
+    if resource is None:
+        return None
+    scale = 1024 if sys.platform == "darwin" else 1
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // scale
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss // scale
+    return max(own, children)
+
+
+class Results:
+    """Накопление замеров по именам"""
+
+    def __init__(self):
+        self.samples = {}
+
+    def measure(self, name, fixture, func):
+        """Один запуск func с подсчётом времени, процессов и роста пиковой памяти"""
+        rss_before = peak_rss_kb()
+        with open(os.devnull, "w", encoding="utf-8") as devnull, \
+                contextlib.redirect_stdout(devnull), SpawnCounter() as spawns:
+            started = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - started
+        rss_after = peak_rss_kb()
+        growth = rss_after - rss_before if rss_after is not None else None
+        self.add(name, fixture, elapsed, spawns.count, spawns.commands, growth)
+
+    def add(self, name, fixture, seconds, spawns, commands=0, rss_growth=None):
+        entry = self.samples.setdefault((name, fixture), {"seconds": [], "spawns": [], "commands": []})
+        entry["seconds"].append(seconds)
+        entry["spawns"].append(spawns)
+        entry["commands"].append(commands)
+        entry["peak_rss_kb"] = peak_rss_kb()
+        if rss_growth is not None:
+            entry["rss_growth_kb"] = max(entry.get("rss_growth_kb", 0), rss_growth)
+
+    def cases(self):
+        """Сводка по каждому замеру"""
+        cases = []
+        for (name, fixture), entry in self.samples.items():
+            seconds = entry["seconds"]
+            cases.append({
+                "name": name,
+                "fixture": fixture,
+                "runs": len(seconds),
+                "p50_ms": percentile(seconds, 0.50) * 1000,
+                "p95_ms": percentile(seconds, 0.95) * 1000,
+                "mean_ms": sum(seconds) / len(seconds) * 1000,
+                "spawns_per_run": sum(entry["spawns"]) / len(entry["spawns"]),
+                "shell_commands_per_run": sum(entry["commands"]) / len(entry["commands"]),
+                # Максимум за всё время процесса к концу замера, а не память этого замера
+                "peak_rss_kb": entry["peak_rss_kb"],
+                # Наибольший рост этого максимума за один запуск замера
+                "rss_growth_kb": entry.get("rss_growth_kb"),
+            })
+        return cases
+
+
+def bench_steps(results, runs, work_dir):
+    """Все шаги курса по очереди в новой папке на каждый запуск"""
+    for run in range(runs):
+        base_dir = tempfile.mkdtemp(prefix=f"steps_{run}_", dir=work_dir)
+        learning = GitLearning(project_name="bench_project", base_dir=base_dir, interactive=False)
+        try:
+            for step in learning.steps():
+                results.measure(step.__name__, "tutorial", step)
+        finally:
+            learning.flush_staged()
+            learning.close_shell()
+
+
+def bench_create_files(results, runs, work_dir):
+    """git_learning_final.create_files в пустой папке"""
+    for run in range(runs):
+        project_dir = tempfile.mkdtemp(prefix=f"files_{run}_", dir=work_dir)
+        results.measure("create_files", "empty", lambda: git_learning_final.create_files(project_dir))
+
+
+def bench_fixture(results, runs, fixture, path):
+    """Обёртки команд и итоги на готовом репозитории"""
+    learning = GitLearning(project_name=os.path.basename(path),
+                           base_dir=os.path.dirname(path), interactive=False)
+    learning.workdir = path
+    try:
+        for command in FIXTURE_COMMANDS:
+            for _ in range(runs):
+                results.measure(f"run_command[{command}]", fixture,
+                                lambda: learning.run_command(command, command, wait_for_user=False))
+                results.measure(f"run_command_safe[{command}]", fixture,
+                                lambda: git_learning_final.run_command_safe(command, command, wait=False, cwd=path))
+        for _ in range(runs):
+            results.measure("step_10_summary", fixture, learning.step_10_summary)
+    finally:
+        learning.close_shell()
+
+
+def compare(cases, baseline_path, threshold):
+    """Сравнение p50 с сохранённым запуском; возвращает число регрессий"""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {(case["name"], case["fixture"]): case for case in json.load(f)["cases"]}
+    regressions = 0
+    print(f"\n📈 Сравнение с {baseline_path} (порог x{threshold}):")
+    for case in cases:
+        old = baseline.get((case["name"], case["fixture"]))
+        if not old or not old["p50_ms"]:
+            continue
+        ratio = case["p50_ms"] / old["p50_ms"]
+        if ratio > threshold:
+            regressions += 1
+            print(f"  ❌ {case['name']} [{case['fixture']}]: "
+                  f"{old['p50_ms']:.1f} -> {case['p50_ms']:.1f} мс (x{ratio:.2f})")
+    if not regressions:
+        print("  ✅ Регрессий нет")
+    return regressions
+
+
+def print_report(cases):
+    print("\n" + "="*100)
+    print("⏱️  ЗАМЕРЫ")
+    print("="*100)
+    print(f"  {'замер':<44} {'репозиторий':<12} {'p50, мс':>9} {'p95, мс':>9} {'процессов':>10} "
+          f"{'в оболочке':>10} {'рост RSS, КБ':>13}")
+    for case in cases:
+        growth = case["rss_growth_kb"] if case["rss_growth_kb"] is not None else "-"
+        print(f"  {case['name']:<44} {case['fixture']:<12} {case['p50_ms']:9.1f} {case['p95_ms']:9.1f} "
+              f"{case['spawns_per_run']:10.1f} {case['shell_commands_per_run']:10.1f} {growth:>13}")
+    peaks = [case["peak_rss_kb"] for case in cases if case["peak_rss_kb"] is not None]
+    if peaks:
+        print(f"\n  Пиковая память за весь запуск (ru_maxrss): {max(peaks)} КБ")
+
+
+def main():
+    """Точка входа"""
+    parser = argparse.ArgumentParser(description="Замеры производительности обучающих скриптов Git")
+    parser.add_argument("--runs", type=int, default=5, help="запусков каждого замера")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="размеры тестовых репозиториев (коммитов через запятую)")
+    parser.add_argument("--json", help="сохранить результат в JSON")
+    parser.add_argument("--compare", help="JSON предыдущего запуска для сравнения")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="допустимый рост p50 при сравнении")
+    parser.add_argument("--keep", action="store_true", help="не удалять тестовые репозитории")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    work_dir = tempfile.mkdtemp(prefix="git_learning_bench_")
+    results = Results()
+    try:
+        print("🧪 Шаги курса...")
+        bench_steps(results, args.runs, work_dir)
+        bench_create_files(results, args.runs, work_dir)
+        for size in sizes:
+            print(f"🧪 Репозиторий на {size} коммитов...")
+            with open(os.devnull, "w", encoding="utf-8") as devnull, contextlib.redirect_stdout(devnull):
+                summary = generate(os.path.join(work_dir, f"fixture_{size}"), commits=size, branches=size // 500)
+            bench_fixture(results, args.runs, f"{size}", summary["path"])
+    finally:
+        if args.keep:
+            print(f"📁 Тестовые репозитории: {work_dir}")
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    cases = results.cases()
+    print_report(cases)
+
+    report = {
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": sys.platform,
+        "git": git_resolver.git_version(),
+        "runs": args.runs,
+        "cases": cases,
+    }
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n📄 Результат сохранён в {args.json}")
+
+    if args.compare and compare(cases, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
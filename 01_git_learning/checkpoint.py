@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Контрольные точки обучающего курса
+После каждого успешного шага в JSON-файл (рядом с папкой проекта, а не
+внутри неё) записываются имя шага, хеши файлов проекта и состояние HEAD.
+При повторном запуске шаги, чей результат на диске не изменился,
+пропускаются.
+"""
+import json
+import os
+
+from git_reader import GitReaderUnsupported, GitRepoReader, hash_blob
+
+CHECKPOINT_VERSION = 1
+
+
+def snapshot(workdir):
+    """Состояние проекта: {"files": {путь: sha}, "head": [ветка, sha]}"""
+    files = {}
+    for root, dirs, names in os.walk(workdir):
+        if root == workdir and ".git" in dirs:
+            dirs.remove(".git")
+        for name in names:
+            path = os.path.join(root, name)
+            try:
+                with open(path, "rb") as f:
+                    sha = hash_blob(f.read())
+            except OSError:
+                continue
+            files[os.path.relpath(path, workdir).replace(os.sep, "/")] = sha
+    try:
+        reader = GitRepoReader(workdir)
+        try:
+            head = list(reader.head())
+        finally:
+            reader.close()
+    except (GitReaderUnsupported, OSError):
+        head = None
+    return {"files": files, "head": head}
+
+
+class Checkpoint:
+    """Файл контрольной точки одного проекта"""
+
+    def __init__(self, path):
+        self.path = path
+        self.data = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return self._empty()
+        if data.get("version") != CHECKPOINT_VERSION:
+            return self._empty()
+        return data
+
+    @staticmethod
+    def _empty():
+        return {"version": CHECKPOINT_VERSION, "workdir": None, "steps": []}
+
+    @property
+    def workdir(self):
+        return self.data["workdir"]
+
+    def record(self, step_name, workdir, steps_completed):
+        """Запомнить успешный шаг и состояние проекта после него"""
+        self.data["workdir"] = workdir
+        self.data["steps"].append({
+            "name": step_name,
+            "steps_completed": steps_completed,
+            "state": snapshot(workdir),
+        })
+        self.save()
+
+    def resume_point(self, step_names):
+        """
+        Сколько первых шагов можно пропустить
+        Ищется последний записанный шаг, после которого файлы проекта и HEAD
+        не изменились. Возвращает (число шагов, запись шага) или (0, None).
+        """
+        workdir = self.workdir
+        if not workdir or not os.path.isdir(workdir):
+            return 0, None
+        recorded = self.data["steps"]
+        # Записи должны идти в том же порядке, что и шаги курса
+        positions = [step_names.index(entry["name"]) if entry["name"] in step_names else -1
+                     for entry in recorded]
+        if not recorded or -1 in positions or positions != sorted(positions):
+            return 0, None
+        current = snapshot(workdir)
+        for position, entry in zip(reversed(positions), reversed(recorded)):
+            state = entry["state"]
+            unchanged = state["head"] == current["head"] and all(
+                current["files"].get(path) == sha for path, sha in state["files"].items()
+            )
+            if unchanged:
+                return position + 1, entry
+        return 0, None
+
+    def save(self):
+        """Атомарная запись файла"""
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        """Удалить контрольную точку (курс пройден или начат заново)"""
+        self.data = self._empty()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
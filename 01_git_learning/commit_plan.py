@@ -0,0 +1,583 @@
+#!/usr/bin/env python3
+"""
+План коммитов: файлы + сообщение, применяемые одной операцией
+Объекты (blob, tree, commit) записываются прямо в .git/objects, затем
+обновляются ветка, reflog и индекс - без запуска git. Хуки git при этом
+не вызываются, поэтому план подходит для сценариев и демо-репозиториев.
+Файлы рабочей папки записываются как есть: если git add мог бы их
+преобразовать (core.autocrlf, core.eol, .gitattributes), план не применяется.
+"""
+import hashlib
+import os
+import stat
+import struct
+import sys
+import time
+import uuid
+import zlib
+
+import git_resolver
+from git_reader import OBJ_TYPES, GitReaderUnsupported, GitRepoReader, hash_blob, read_config
+
+# SHA пустого дерева
+EMPTY_TREE = "4b825dc642cb6eb9a060e54bf8d69288fbee4904"
+# Номера типов объектов в pack-файле
+PACK_TYPES = {name: number for number, name in OBJ_TYPES.items()}
+
+
+class CommitPlanError(Exception):
+    """План нельзя применить напрямую - нужно выполнить команды git"""
+
+
+def _config_value(configs, section, key):
+    """Значение из первого конфига, где оно есть"""
+    for config in configs:
+        value = config.get((section, None), {}).get(key)
+        if value:
+            return value
+    return None
+
+
+def _env_config():
+    """Настройки из переменных GIT_CONFIG_COUNT / GIT_CONFIG_KEY_n / GIT_CONFIG_VALUE_n"""
+    config = {}
+    try:
+        count = int(os.environ.get("GIT_CONFIG_COUNT", "0"))
+    except ValueError:
+        raise CommitPlanError("Неверное значение GIT_CONFIG_COUNT")
+    for n in range(count):
+        name = os.environ.get(f"GIT_CONFIG_KEY_{n}", "")
+        section, _, key = name.rpartition(".")
+        if not section:
+            raise CommitPlanError(f"Неверный ключ конфига: {name}")
+        section, _, sub = section.partition(".")
+        config.setdefault((section.lower(), sub or None), {})[key.lower()] = os.environ.get(f"GIT_CONFIG_VALUE_{n}", "")
+    return config
+
+
+def system_config_path():
+    """
+    Системный конфиг git: путь или None, если он отключён
+    Если путь нельзя определить надёжно (Git for Windows, git из Xcode),
+    CommitPlanError - команды выполняются обычным git.
+    """
+    if os.environ.get("GIT_CONFIG_NOSYSTEM", "").lower() in ("1", "true", "yes", "on"):
+        return None
+    if os.environ.get("GIT_CONFIG_SYSTEM"):
+        return os.environ["GIT_CONFIG_SYSTEM"]
+    git = git_resolver.find_git()
+    if git is None or os.name == "nt":
+        raise CommitPlanError("Не удалось определить системный конфиг git")
+    prefix = os.path.dirname(os.path.dirname(os.path.realpath(git)))
+    if prefix == "/usr":
+        if not sys.platform.startswith("linux"):
+            raise CommitPlanError("Не удалось определить системный конфиг git")
+        return "/etc/gitconfig"
+    return os.path.join(prefix, "etc", "gitconfig")
+
+
+def _timezone(timestamp):
+    """Смещение часового пояса в формате git: +0300"""
+    offset = time.localtime(timestamp).tm_gmtoff // 60
+    sign = "+" if offset >= 0 else "-"
+    offset = abs(offset)
+    return f"{sign}{offset // 60:02d}{offset % 60:02d}"
+
+
+class TreeNode:
+    """
+    Папка дерева в памяти
+    Готовые записи и SHA хранятся между коммитами, поэтому заново
+    записываются только папки на пути изменённых файлов.
+    """
+
+    def __init__(self):
+        self.files = {}
+        self.dirs = {}
+        self.sha = None
+        self._order = None
+
+    def set(self, parts, entry):
+        """Записать файл (entry = (режим, sha)) или удалить его (entry = None)"""
+        self.sha = None
+        name = parts[0]
+        if len(parts) > 1:
+            child = self.dirs.get(name)
+            if child is None:
+                if entry is None:
+                    return
+                child = self.dirs[name] = TreeNode()
+                self._order = None
+            child.set(parts[1:], entry)
+            if not child.files and not child.dirs:
+                del self.dirs[name]
+                self._order = None
+        elif entry is None:
+            if self.files.pop(name, None) is not None:
+                self._order = None
+        else:
+            if name not in self.files:
+                self._order = None
+            mode, sha = entry
+            self.files[name] = f"{mode} {name}".encode("utf-8", errors="surrogateescape") + b"\0" + bytes.fromhex(sha)
+
+    def write(self, write_object):
+        """SHA дерева (изменённые папки записываются через write_object)"""
+        if self.sha is None:
+            if self._order is None:
+                # Папки сортируются так, как будто их имя заканчивается на "/"
+                keys = [(name, False) for name in self.files] + [(name, True) for name in self.dirs]
+                keys.sort(key=lambda key: (key[0] + "/" if key[1] else key[0]).encode("utf-8", errors="surrogateescape"))
+                self._order = keys
+            parts = []
+            for name, is_dir in self._order:
+                if is_dir:
+                    sha = self.dirs[name].write(write_object)
+                    parts.append(f"40000 {name}".encode("utf-8", errors="surrogateescape") + b"\0" + bytes.fromhex(sha))
+                else:
+                    parts.append(self.files[name])
+            self.sha = write_object("tree", b"".join(parts))
+        return self.sha
+
+
+class PackWriter:
+    """Запись объектов одним pack-файлом (без дельт) вместе с индексом .idx"""
+
+    def __init__(self, objects_dir):
+        self.pack_dir = os.path.join(objects_dir, "pack")
+        os.makedirs(self.pack_dir, exist_ok=True)
+        self.tmp_path = os.path.join(self.pack_dir, f"tmp_pack_{os.getpid()}_{uuid.uuid4().hex}")
+        self.file = open(self.tmp_path, "w+b")
+        # Число объектов в заголовке записывается в конце
+        self.file.write(b"PACK" + struct.pack(">II", 2, 0))
+        self.entries = {}
+
+    def add(self, obj_type, data, sha):
+        """Добавить объект (повторы пропускаются)"""
+        binsha = bytes.fromhex(sha)
+        if binsha in self.entries:
+            return
+        size = len(data)
+        byte = (PACK_TYPES[obj_type] << 4) | (size & 0x0F)
+        size >>= 4
+        header = bytearray()
+        while size:
+            header.append(byte | 0x80)
+            byte = size & 0x7F
+            size >>= 7
+        header.append(byte)
+        raw = bytes(header) + zlib.compress(data, 1)
+        self.entries[binsha] = (self.file.tell(), zlib.crc32(raw))
+        self.file.write(raw)
+
+    def finish(self):
+        """Записать заголовок, контрольную сумму и .idx; вернуть имя pack-файла"""
+        self.file.seek(8)
+        self.file.write(struct.pack(">I", len(self.entries)))
+        self.file.seek(0)
+        digest = hashlib.sha1()
+        for chunk in iter(lambda: self.file.read(1024 * 1024), b""):
+            digest.update(chunk)
+        pack_sha = digest.digest()
+        self.file.write(pack_sha)
+        self.file.close()
+
+        shas = sorted(self.entries)
+        fanout = [0] * 256
+        for binsha in shas:
+            fanout[binsha[0]] += 1
+        for i in range(1, 256):
+            fanout[i] += fanout[i - 1]
+        offsets = []
+        large = []
+        for binsha in shas:
+            offset = self.entries[binsha][0]
+            if offset < 0x80000000:
+                offsets.append(offset)
+            else:
+                offsets.append(0x80000000 | len(large))
+                large.append(offset)
+        idx = b"".join([
+            b"\377tOc", struct.pack(">I", 2),
+            struct.pack(">256I", *fanout),
+            b"".join(shas),
+            struct.pack(f">{len(shas)}I", *(self.entries[binsha][1] for binsha in shas)),
+            struct.pack(f">{len(shas)}I", *offsets),
+            struct.pack(f">{len(large)}Q", *large),
+            pack_sha,
+        ])
+        idx += hashlib.sha1(idx).digest()
+
+        # Сначала .pack, затем .idx: git ищет объекты по индексам
+        name = os.path.join(self.pack_dir, f"pack-{pack_sha.hex()}")
+        os.chmod(self.tmp_path, 0o444)
+        os.replace(self.tmp_path, name + ".pack")
+        with open(name + ".idx.tmp", "wb") as f:
+            f.write(idx)
+        os.chmod(name + ".idx.tmp", 0o444)
+        os.replace(name + ".idx.tmp", name + ".idx")
+        return name + ".pack"
+
+    def abort(self):
+        """Удалить незавершённый pack-файл"""
+        self.file.close()
+        try:
+            os.remove(self.tmp_path)
+        except OSError:
+            pass
+
+
+class CommitPlan:
+    """Набор коммитов, которые применяются к ветке за один раз"""
+
+    def __init__(self, repo_dir=".", branch=None, start_point=None, packed=False):
+        try:
+            self.reader = GitRepoReader(repo_dir)
+        except GitReaderUnsupported as e:
+            raise CommitPlanError(str(e))
+        self.objects_dir = os.path.join(self.reader.common_dir, "objects")
+        head_ref, _ = self.reader.head()
+        if branch is None:
+            if head_ref is None:
+                raise CommitPlanError("Detached HEAD: укажите ветку явно")
+            self.ref = head_ref
+        else:
+            self.ref = branch if branch.startswith("refs/") else f"refs/heads/{branch}"
+        self.is_head = self.ref == head_ref
+        # Родитель первого коммита, если ветки ещё нет
+        self.start_point = start_point
+        # packed=True - все объекты плана пишутся одним pack-файлом
+        self.packed = packed
+        self._pack = None
+        self._configs = None
+        self._system_error = None
+        self.commits = []
+
+    # ---------- описание плана ----------
+
+    def add_commit(self, files, message, when=None):
+        """
+        Добавить коммит в план
+        files - список путей (содержимое берётся из рабочей папки) или
+        словарь {путь: str | bytes | None}; None означает удаление файла.
+        """
+        if not isinstance(files, dict):
+            files = list(files)
+            self.check_conversion(files)
+            files = {path: self._read_worktree(path) for path in files}
+        changes = {}
+        for path, content in files.items():
+            path = path.replace(os.sep, "/")
+            if path.startswith("./"):
+                path = path[2:]
+            if isinstance(content, str):
+                content = content.encode("utf-8")
+            if content is not None and not isinstance(content, tuple):
+                content = ("100644", content)
+            changes[path] = content
+        self.commits.append((changes, message, when))
+        return self
+
+    def configs(self):
+        """Конфиги git от старшего к младшему: окружение, репозиторий, пользователь, система"""
+        if self._configs is None:
+            home = os.path.expanduser("~")
+            xdg = os.environ.get("XDG_CONFIG_HOME") or os.path.join(home, ".config")
+            if os.environ.get("GIT_CONFIG_GLOBAL"):
+                user = [os.environ["GIT_CONFIG_GLOBAL"]]
+            else:
+                user = [os.path.join(home, ".gitconfig"), os.path.join(xdg, "git", "config")]
+            # Без системного конфига можно узнать автора, но не преобразования файлов
+            try:
+                system = system_config_path()
+            except CommitPlanError as e:
+                system, self._system_error = None, e
+            try:
+                configs = [_env_config(), self.reader.config, *(read_config(path) for path in user)]
+                if system is not None:
+                    configs.append(read_config(system))
+            except GitReaderUnsupported as e:
+                raise CommitPlanError(str(e))
+            # Подключаемые файлы не читаются - в них может быть что угодно
+            if any(section[0] in ("include", "includeif") for config in configs for section in config):
+                raise CommitPlanError("Конфиг git подключает другие файлы (include)")
+            self._configs = configs
+        return self._configs
+
+    def check_conversion(self, paths):
+        """
+        CommitPlanError, если git add мог бы изменить содержимое файлов:
+        настроены core.autocrlf / core.eol или есть файлы атрибутов
+        """
+        configs = self.configs()
+        if self._system_error is not None:
+            raise self._system_error
+        autocrlf = _config_value(configs, "core", "autocrlf")
+        if autocrlf and autocrlf.lower() not in ("false", "no", "off", "0"):
+            raise CommitPlanError("Настроен core.autocrlf - файлы добавит git")
+        if _config_value(configs, "core", "eol"):
+            raise CommitPlanError("Настроен core.eol - файлы добавит git")
+        xdg = os.environ.get("XDG_CONFIG_HOME") or os.path.join(os.path.expanduser("~"), ".config")
+        attributes = [
+            os.path.join(self.reader.common_dir, "info", "attributes"),
+            os.path.expanduser(_config_value(configs, "core", "attributesfile")
+                               or os.path.join(xdg, "git", "attributes")),
+        ]
+        directories = {""}
+        for path in paths:
+            parts = path.replace(os.sep, "/").split("/")[:-1]
+            directories.update("/".join(parts[:n]) for n in range(1, len(parts) + 1))
+        for directory in directories:
+            attributes.append(os.path.join(self.reader.worktree, *directory.split("/"), ".gitattributes"))
+        for path in attributes:
+            if os.path.exists(path):
+                raise CommitPlanError(f"Найден файл атрибутов {path} - файлы добавит git")
+
+    def _read_worktree(self, path):
+        """Содержимое файла рабочей папки: (режим, байты) или None, если файла нет"""
+        full = os.path.join(self.reader.worktree, *path.replace(os.sep, "/").split("/"))
+        try:
+            st = os.lstat(full)
+        except FileNotFoundError:
+            return None
+        if not stat.S_ISREG(st.st_mode):
+            raise CommitPlanError(f"Поддерживаются только обычные файлы: {path}")
+        filemode = self.reader.config.get(("core", None), {}).get("filemode", "true")
+        executable = os.name != "nt" and filemode != "false" and st.st_mode & 0o100
+        with open(full, "rb") as f:
+            return ("100755" if executable else "100644", f.read())
+
+    # ---------- запись объектов ----------
+
+    def write_object(self, obj_type, data):
+        """Запись объекта (loose или в pack-файл плана); возвращает его SHA"""
+        raw = f"{obj_type} {len(data)}".encode("ascii") + b"\0" + data
+        sha = hashlib.sha1(raw).hexdigest()
+        if self._pack is not None:
+            self._pack.add(obj_type, data, sha)
+            return sha
+        directory = os.path.join(self.objects_dir, sha[:2])
+        path = os.path.join(directory, sha[2:])
+        if os.path.exists(path):
+            return sha
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = os.path.join(directory, f"tmp_obj_{os.getpid()}_{sha[2:10]}")
+        with open(tmp_path, "wb") as f:
+            f.write(zlib.compress(raw, 1))
+        os.chmod(tmp_path, 0o444)
+        os.replace(tmp_path, path)
+        return sha
+
+    def write_tree(self, files):
+        """Запись дерева из плоского словаря {путь: (режим, sha)}"""
+        return self._tree_node(files).write(self.write_object)
+
+    @staticmethod
+    def _tree_node(files):
+        root = TreeNode()
+        for path, entry in files.items():
+            root.set(path.split("/"), entry)
+        return root
+
+    def identity(self):
+        """Автор коммитов: переменные GIT_* или user.name/user.email из конфигов"""
+        configs = self.configs()
+        name = os.environ.get("GIT_AUTHOR_NAME") or _config_value(configs, "user", "name")
+        email = os.environ.get("GIT_AUTHOR_EMAIL") or _config_value(configs, "user", "email")
+        if not name or not email:
+            raise CommitPlanError("Не настроены user.name и user.email")
+        return f"{name} <{email}>"
+
+    # ---------- применение ----------
+
+    def apply(self, sync_index=True):
+        """Записать все коммиты плана и передвинуть ветку; возвращает SHA коммитов"""
+        if not self.commits:
+            return []
+        try:
+            old_tip = self.reader.read_ref(self.ref)
+            base = old_tip or self.start_point
+            base_tree = self.reader.commit(base).tree if base else EMPTY_TREE
+            files = self.reader.tree_files(base_tree) if base else {}
+        except GitReaderUnsupported as e:
+            raise CommitPlanError(str(e))
+        ident = self.identity()
+        if self.packed:
+            self._pack = PackWriter(self.objects_dir)
+        try:
+            created, messages, changed_paths = self._write_commits(base, base_tree, files, ident)
+            if self._pack is not None:
+                self._pack.finish()
+        except BaseException:
+            if self._pack is not None:
+                self._pack.abort()
+            raise
+        finally:
+            self._pack = None
+
+        # Индекс собирается и проверяется до того, как ветка сдвинется
+        records = None
+        if sync_index and self.is_head:
+            records = self.index_records(files, changed_paths)
+        self.update_ref(old_tip, created[-1])
+        if records is not None:
+            try:
+                self.write_index(records)
+            except BaseException:
+                # Ветка возвращается назад, чтобы не расходиться с индексом
+                self.update_ref(created[-1], old_tip)
+                raise
+        self.write_reflog(old_tip, created, messages)
+        self.commits = []
+        return created
+
+    def _write_commits(self, parent, tree, files, ident):
+        """
+        Объекты всех коммитов плана; files обновляется до последнего дерева
+        Коммит без изменений дерева - CommitPlanError, как "nothing to commit" у git.
+        """
+        created = []
+        changed_paths = set()
+        messages = []
+        root = self._tree_node(files)
+        for changes, message, when in self.commits:
+            for path, content in changes.items():
+                changed_paths.add(path)
+                if content is None:
+                    files.pop(path, None)
+                else:
+                    mode, data = content
+                    files[path] = (mode, self.write_object("blob", data))
+                root.set(path.split("/"), files.get(path))
+            timestamp = int(when if when is not None else time.time())
+            signature = f"{ident} {timestamp} {_timezone(timestamp)}"
+            if not message.endswith("\n"):
+                message += "\n"
+            previous, tree = tree, root.write(self.write_object)
+            if tree == previous:
+                raise CommitPlanError("Нечего коммитить: дерево не изменилось")
+            lines = [f"tree {tree}"]
+            if parent:
+                lines.append(f"parent {parent}")
+            lines += [f"author {signature}", f"committer {signature}", "", message]
+            parent = self.write_object("commit", "\n".join(lines).encode("utf-8"))
+            created.append(parent)
+            messages.append((signature, message.split("\n", 1)[0]))
+        return created, messages, changed_paths
+
+    def _lock(self, path):
+        """Создать lock-файл так же, как это делает git"""
+        try:
+            return os.open(path + ".lock", os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+        except FileExistsError:
+            raise CommitPlanError(f"Файл заблокирован другим процессом git: {path}.lock")
+
+    def update_ref(self, old, new):
+        """Перевод ветки с old на new с проверкой старого значения (new=None - удалить ветку)"""
+        path = os.path.join(self.reader.common_dir, *self.ref.split("/"))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd = self._lock(path)
+        try:
+            if self.reader.read_ref(self.ref) != old:
+                raise CommitPlanError(f"Ветка {self.ref} изменилась во время применения плана")
+            if new is None:
+                os.close(fd)
+                fd = None
+                os.remove(path)
+                os.remove(path + ".lock")
+                return
+            os.write(fd, f"{new}\n".encode("ascii"))
+            os.close(fd)
+            fd = None
+            os.replace(path + ".lock", path)
+        except BaseException:
+            if fd is not None:
+                os.close(fd)
+            if os.path.exists(path + ".lock"):
+                os.remove(path + ".lock")
+            raise
+
+    def write_reflog(self, old, created, messages):
+        """Reflog: по строке на каждый коммит, как после обычного git commit"""
+        logs = [os.path.join(self.reader.common_dir, "logs", *self.ref.split("/"))]
+        if self.is_head:
+            logs.append(os.path.join(self.reader.git_dir, "logs", "HEAD"))
+        entries = []
+        previous = old or "0" * 40
+        initial = old is None and self.start_point is None
+        for sha, (signature, summary) in zip(created, messages):
+            kind = "commit (initial)" if initial and previous == "0" * 40 else "commit"
+            entries.append(f"{previous} {sha} {signature}\t{kind}: {summary}\n")
+            previous = sha
+        for log_path in logs:
+            os.makedirs(os.path.dirname(log_path), exist_ok=True)
+            with open(log_path, "a", encoding="utf-8") as f:
+                f.writelines(entries)
+
+    def index_records(self, files, changed_paths):
+        """Записи индекса, соответствующие новому коммиту для изменённых путей"""
+        try:
+            entries = {entry.path: entry for entry in self.reader.read_index()}
+        except GitReaderUnsupported as e:
+            raise CommitPlanError(str(e))
+        if any(entry.stage or entry.extended for entry in entries.values()):
+            raise CommitPlanError("Индекс с конфликтами или расширенными флагами не поддерживается")
+
+        records = {path: (entry.stat, entry.sha) for path, entry in entries.items()}
+        for path in changed_paths:
+            if path not in files:
+                records.pop(path, None)
+                continue
+            mode, sha = files[path]
+            records[path] = (self._index_stat(path, mode, sha), sha)
+        return records
+
+    def sync_index(self, files, changed_paths):
+        """Привести индекс в соответствие с новым коммитом для изменённых путей"""
+        self.write_index(self.index_records(files, changed_paths))
+
+    def _index_stat(self, path, mode, sha):
+        """Поля stat для записи индекса; нули, если файл в папке отличается"""
+        full = os.path.join(self.reader.worktree, *path.split("/"))
+        mode_bits = int(mode, 8)
+        try:
+            st = os.stat(full)
+            with open(full, "rb") as f:
+                matches = hash_blob(f.read()) == sha
+        except OSError:
+            matches = False
+        if not matches:
+            # git увидит несовпадение и пересчитает хеш файла сам
+            return (0, 0, 0, 0, 0, 0, mode_bits, 0, 0, 0)
+        ctime_s, ctime_ns = divmod(st.st_ctime_ns, 1_000_000_000)
+        mtime_s, mtime_ns = divmod(st.st_mtime_ns, 1_000_000_000)
+        values = (ctime_s, ctime_ns, mtime_s, mtime_ns, st.st_dev, st.st_ino,
+                  mode_bits, getattr(st, "st_uid", 0), getattr(st, "st_gid", 0), st.st_size)
+        return tuple(value & 0xFFFFFFFF for value in values)
+
+    def write_index(self, records):
+        """Запись индекса версии 2: {путь: (stat, sha)}"""
+        body = [b"DIRC", struct.pack(">II", 2, len(records))]
+        for path in sorted(records, key=lambda p: p.encode("utf-8", errors="surrogateescape")):
+            stat_values, sha = records[path]
+            name = path.encode("utf-8", errors="surrogateescape")
+            entry = struct.pack(">10I", *stat_values) + bytes.fromhex(sha)
+            entry += struct.pack(">H", min(len(name), 0xFFF)) + name
+            # Запись дополняется нулями до кратной 8 длины (минимум один ноль)
+            entry += b"\0" * (8 - len(entry) % 8)
+            body.append(entry)
+        data = b"".join(body)
+        data += hashlib.sha1(data).digest()
+
+        path = os.path.join(self.reader.git_dir, "index")
+        fd = self._lock(path)
+        try:
+            os.write(fd, data)
+            os.close(fd)
+            fd = None
+            os.replace(path + ".lock", path)
+        except BaseException:
+            if fd is not None:
+                os.close(fd)
+            os.remove(path + ".lock")
+            raise
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Запись файлов только при изменении содержимого
+Если на диске уже лежит то же самое, файл не трогается: mtime не меняется,
+и git не пересчитывает его хеш. Хеш содержимого запоминается вместе с
+данными stat, поэтому повторная проверка не читает файл. Изменённые файлы
+записываются атомарно: во временный файл рядом и затем os.replace.
+"""
+import hashlib
+import os
+import threading
+
+# {путь: (размер, mtime_ns, inode, sha1 содержимого)}
+_stat_cache = {}
+_lock = threading.Lock()
+
+
+def _signature(st):
+    return (st.st_size, st.st_mtime_ns, st.st_ino)
+
+
+def _current_hash(path, st):
+    """Хеш содержимого файла на диске (из кэша, если stat не изменился)"""
+    with _lock:
+        cached = _stat_cache.get(path)
+    if cached and cached[:3] == _signature(st):
+        return cached[3]
+    with open(path, "rb") as f:
+        digest = hashlib.sha1(f.read()).hexdigest()
+    with _lock:
+        _stat_cache[path] = _signature(st) + (digest,)
+    return digest
+
+
+def write_bytes(path, data):
+    """Записать data в path, если содержимое отличается; True - файл записан"""
+    path = os.path.abspath(path)
+    digest = hashlib.sha1(data).hexdigest()
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        st = None
+    if st is not None and st.st_size == len(data) and _current_hash(path, st) == digest:
+        return False
+
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        if st is not None:
+            # Права существующего файла сохраняются
+            os.chmod(tmp_path, st.st_mode & 0o7777)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    st = os.stat(path)
+    with _lock:
+        _stat_cache[path] = _signature(st) + (digest,)
+    return True
+
+
+def write_text(path, content, encoding="utf-8"):
+    """
+    Текстовая версия write_bytes
+    Переводы строк записываются так же, как open(path, "w") на этой системе.
+    """
+    if os.linesep != "\n":
+        content = content.replace("\n", os.linesep)
+    return write_bytes(path, content.encode(encoding))
+
+
+def clear_cache():
+    with _lock:
+        _stat_cache.clear()
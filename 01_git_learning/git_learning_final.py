@@ -3,9 +3,18 @@
 Git Learning - Финальная версия без ошибок кодировки
 """
 import os
-import subprocess
 import sys
-from datetime import datetime
+
+from lazy_imports import lazy_import
+
+# Модули загружаются при первом обращении
+datetime = lazy_import("datetime")
+file_writer = lazy_import("file_writer")
+git_reader = lazy_import("git_reader")
+inventory = lazy_import("inventory")
+output_stream = lazy_import("output_stream")
+script_runner = lazy_import("script_runner")
+templates = lazy_import("templates")
 
 def print_header(text):
     """Красивый заголовок"""
@@ -18,9 +27,10 @@ def print_step(step, total, text):
     print(f"\n📝 ШАГ {step}/{total}: {text}")
     print("-"*50)
 
-def run_command_safe(command, description, wait=True):
+def run_command_safe(command, description, wait=True, cwd=None):
     """
     Безопасный запуск команд с обработкой кодировки Windows
+    cwd - папка, в которой выполняется команда
     """
     print(f"\n💻 {description}")
     print(f"   Команда: {command}")
@@ -29,38 +39,36 @@ def run_command_safe(command, description, wait=True):
         input("\n   Нажмите Enter для выполнения...")
     
     try:
-        # Для Windows используем правильную кодировку (cp866 для русской Windows)
-        result = subprocess.run(
-            command,
-            shell=True,
-            capture_output=True,
-            text=False  # Не конвертируем в текст сразу!
-        )
-        
-        # Пытаемся декодировать с разными кодировками
-        encodings = ['utf-8', 'cp866', 'cp1251', 'iso-8859-1']
+        # Вывод читается построчно в байтах (не конвертируем в текст сразу!):
+        # на экран попадает не больше 300 символов, остальное только подсчитывается
+        output = output_stream.LineLimiter("\n✅ Результат:", limit=300)
+        errors = output_stream.BoundedBuffer(limit=300)
         
-        stdout_decoded = ""
-        stderr_decoded = ""
+        # Кодировка определяется по первому не-ASCII выводу (сначала utf-8, затем
+        # запомненная для этого типа команды, например cp866 для русской Windows)
+        key = (output_stream.command_kind(command), sys.platform)
+        stdout_decoder = output_stream.OutputDecoder(key)
+        stderr_decoder = output_stream.OutputDecoder(key)
         
-        for encoding in encodings:
-            try:
-                stdout_decoded = result.stdout.decode(encoding)
-                stderr_decoded = result.stderr.decode(encoding)
-                break
-            except UnicodeDecodeError:
-                continue
+        def on_stdout(line):
+            # После 300 символов байты уже не декодируются и считаются как байты
+            if output.full:
+                output.skip(len(line))
+            else:
+                output.feed(stdout_decoder.decode(line))
         
-        # Если не удалось декодировать, используем байты
-        if not stdout_decoded and not stderr_decoded:
-            stdout_decoded = str(result.stdout)[:200]
-            stderr_decoded = str(result.stderr)[:200]
+        def on_stderr(line):
+            if errors.size < errors.limit:
+                errors.feed(stderr_decoder.decode(line))
         
-        if stdout_decoded.strip():
-            print(f"\n✅ Результат:\n{stdout_decoded[:300]}")
+        output_stream.stream_command(command, on_stdout, on_stderr, cwd=cwd, encoding=None)
+        if not output.full:
+            output.feed(stdout_decoder.flush())
+        output.close()
         
+        stderr_decoded = errors.text
         if stderr_decoded.strip() and "warning" not in stderr_decoded.lower():
-            print(f"\n⚠️  Ошибки:\n{stderr_decoded[:300]}")
+            print(f"\n⚠️  Ошибки:\n{stderr_decoded}")
         
         return True
         
@@ -68,122 +76,46 @@ def run_command_safe(command, description, wait=True):
         print(f"\n❌ Ошибка выполнения: {str(e)[:100]}")
         return False
 
-def create_project():
-    """Создание проекта"""
+def create_project(base_dir="."):
+    """Создание проекта, возвращает имя проекта и путь к его папке"""
     project_name = "my_git_project"
     
-    if os.path.exists(project_name):
+    if os.path.exists(os.path.join(base_dir, project_name)):
         print(f"📁 Папка '{project_name}' уже существует.")
         choice = input("   Удалить и создать заново? (y/n): ").lower()
         if choice == 'y':
             import shutil
-            shutil.rmtree(project_name, ignore_errors=True)
+            shutil.rmtree(os.path.join(base_dir, project_name), ignore_errors=True)
             print(f"✅ Папка удалена")
         else:
             project_name = input("   Введите новое имя проекта: ")
     
-    os.makedirs(project_name, exist_ok=True)
-    os.chdir(project_name)
+    # Папку не делаем текущей: все функции получают путь project_dir
+    project_dir = os.path.abspath(os.path.join(base_dir, project_name))
+    os.makedirs(project_dir, exist_ok=True)
     
-    print(f"📂 Рабочая папка: {os.getcwd()}")
-    return project_name
+    print(f"📂 Рабочая папка: {project_dir}")
+    return project_name, project_dir
 
-def create_files():
+def create_files(project_dir):
     """Создание файлов проекта"""
     print("\n📄 СОЗДАЕМ ФАЙЛЫ ПРОЕКТА:")
     
-    # README.md
-    with open("README.md", "w", encoding="utf-8") as f:
-        f.write(f"""# Мой Git проект
-
-Проект создан для изучения Git.
-
-## Автор
-Вячеслав Ардеев
-
-## Контакты
-Email: ardeev1999@gmail.com
-
-## Технологии
-- Python 3.x
-- Git
-- VS Code
-
-## Дата создания
-{datetime.now().strftime('%Y-%m-%d %H:%M')}
-""")
-    print("✅ README.md создан")
-    
-    # main.py
-    with open("main.py", "w", encoding="utf-8") as f:
-        f.write('''#!/usr/bin/env python3
-"""
-Главный файл проекта
-"""
-
-def main():
-    print("="*50)
-    print("ПРИВЕТСТВИЕ ОТ GIT ПРОЕКТА!")
-    print("="*50)
-    
-    print("\\n👤 Автор: Вячеслав Ардеев")
-    print("📧 Email: ardeev1999@gmail.com")
+    # README.md, main.py и utils.py пишутся одновременно из шаблонов
+    written = templates.scaffold(
+        project_dir,
+        {"README.md": "final/README.md", "main.py": "final/main.py", "utils.py": "final/utils.py"},
+        date=datetime.datetime.now().strftime('%Y-%m-%d %H:%M'),
+    )
+    for filename, created in written.items():
+        print(f"✅ {filename} создан" if created else f"✅ {filename} уже актуален")
     
-    print("\\n🐙 Этот проект создан для изучения Git.")
-    print("\\n🚀 Начните с команд:")
-    print("   git init")
-    print("   git add .")
-    print("   git commit -m 'Сообщение'")
-    print("\\n" + "="*50)
-
-if __name__ == "__main__":
-    main()
-''')
-    print("✅ main.py создан")
-    
-    # utils.py
-    with open("utils.py", "w", encoding="utf-8") as f:
-        f.write('''#!/usr/bin/env python3
-"""
-Вспомогательные функции
-"""
-
-def show_system_info():
-    """Показать информацию о системе"""
-    import platform
-    import sys
-    
-    print("\\n🖥️  ИНФОРМАЦИЯ О СИСТЕМЕ:")
-    print(f"  ОС: {platform.system()} {platform.release()}")
-    print(f"  Python: {sys.version.split()[0]}")
-    print(f"  Архитектура: {platform.architecture()[0]}")
-
-def calculate(a, b):
-    """Простой калькулятор"""
-    print(f"\\n🧮 КАЛЬКУЛЯТОР:")
-    print(f"  {a} + {b} = {a + b}")
-    print(f"  {a} - {b} = {a - b}")
-    print(f"  {a} * {b} = {a * b}")
-    if b != 0:
-        print(f"  {a} / {b} = {a / b:.2f}")
-    else:
-        print("  Деление на ноль!")
-
-if __name__ == "__main__":
-    show_system_info()
-    calculate(10, 2)
-''')
-    print("✅ utils.py создан")
-    
-    # Показываем файлы
+    # Показываем файлы (размеры берутся из os.scandir)
     print("\n📁 Файлы в проекте:")
-    files = os.listdir('.')
-    for file in files:
-        if os.path.isfile(file):
-            size = os.path.getsize(file)
-            print(f"  📄 {file} ({size} байт)")
+    for info in inventory.scan(project_dir, recursive=False):
+        print(f"  📄 {info.path} ({info.size} байт)")
 
-def git_tutorial():
+def git_tutorial(project_dir):
     """Git туториал"""
     print_header("GIT ТУТОРИАЛ - ВЫПОЛНИТЕ ЭТИ КОМАНДЫ")
     
@@ -219,31 +151,26 @@ def git_tutorial():
     # Проверяем результат
     print("\n📊 ПРОВЕРКА РЕЗУЛЬТАТОВ:")
     
-    # Проверяем наличие .git папки
-    if os.path.exists(".git"):
+    # Проверяем .git, HEAD и коммиты напрямую, без запуска git log
+    check = git_reader.verify_repository(project_dir)
+    if check.exists:
         print("✅ Git репозиторий создан (.git/ существует)")
     else:
         print("❌ Git репозиторий не создан")
         print("   Выполните команду: git init")
+        return
     
-    # Проверяем коммиты
-    try:
-        result = subprocess.run(
-            "git log --oneline",
-            shell=True,
-            capture_output=True,
-            text=True,
-            encoding='utf-8'
-        )
-        if result.stdout:
-            print(f"\n✅ История коммитов:\n{result.stdout}")
-        else:
-            print("\n⚠️  Нет коммитов в истории")
-            print("   Выполните: git add . и git commit")
-    except:
-        print("\n⚠️  Не удалось проверить историю")
+    if check.head:
+        count = f"{check.commits}+" if check.limited else f"{check.commits}"
+        print(f"\n✅ Коммитов в ветке {check.branch or 'HEAD'}: {count}")
+        print("   Последние коммиты:")
+        for commit in check.recent:
+            print(f"   {commit.sha[:7]} {commit.summary}")
+    else:
+        print("\n⚠️  Нет коммитов в истории")
+        print("   Выполните: git add . и git commit")
 
-def create_github_instructions():
+def create_github_instructions(project_dir):
     """Инструкции для GitHub"""
     print_header("СЛЕДУЮЩИЕ ШАГИ: GITHUB")
     
@@ -287,31 +214,43 @@ git push -u origin main
     print(instructions)
     
     # Сохраняем инструкции в файл
-    with open("GITHUB_INSTRUCTIONS.md", "w", encoding="utf-8") as f:
-        f.write(instructions)
+    file_writer.write_text(os.path.join(project_dir, "GITHUB_INSTRUCTIONS.md"), instructions)
     
     print("\n📄 Инструкции сохранены в GITHUB_INSTRUCTIONS.md")
 
-def run_project():
+def run_project(project_dir):
     """Запуск проекта"""
     print_header("ЗАПУСК ПРОЕКТА")
     
     print("🧪 ЗАПУСКАЕМ ВАШ ПРОЕКТ:\n")
     
-    if os.path.exists("main.py"):
+    if os.path.exists(os.path.join(project_dir, "main.py")):
         print("🚀 Запуск main.py:")
         print("="*50)
-        os.system("python main.py")
+        show_script(os.path.join(project_dir, "main.py"))
         print("="*50)
     
-    if os.path.exists("utils.py"):
+    if os.path.exists(os.path.join(project_dir, "utils.py")):
         print("\n🚀 Запуск utils.py:")
         print("="*50)
-        os.system("python utils.py")
+        show_script(os.path.join(project_dir, "utils.py"))
         print("="*50)
 
+def show_script(path):
+    """Запуск скрипта проекта внутри текущего процесса и печать его вывода"""
+    result = script_runner.run_script(path)
+    print(result.stdout, end="")
+    if result.stderr:
+        print(f"\n⚠️  Ошибки:\n{result.stderr}")
+    if result.timed_out:
+        print("\n⚠️  Скрипт не завершился вовремя")
+
 def main():
     """Главная функция"""
+    # Устанавливаем кодировку для Windows
+    if os.name == 'nt':
+        sys.stdout.reconfigure(encoding='utf-8')
+    
     print("\n" + "="*70)
     print("🐙 GIT LEARNING - ПРАКТИЧЕСКИЙ КУРС")
     print("="*70)
@@ -323,31 +262,25 @@ def main():
     input("Нажмите Enter чтобы начать...")
     
     try:
-        # Запоминаем начальную папку
-        start_dir = os.getcwd()
-        
         # Создаем проект
         print_header("СОЗДАНИЕ ПРОЕКТА")
-        project_name = create_project()
+        project_name, project_dir = create_project()
         
         # Создаем файлы
         print_header("СОЗДАНИЕ ФАЙЛОВ")
-        create_files()
+        create_files(project_dir)
         
         # Git туториал
         print_header("ОБУЧЕНИЕ GIT")
-        git_tutorial()
+        git_tutorial(project_dir)
         
         # GitHub инструкции
         print_header("РАБОТА С GITHUB")
-        create_github_instructions()
+        create_github_instructions(project_dir)
         
         # Запуск проекта
         print_header("ТЕСТИРОВАНИЕ")
-        run_project()
-        
-        # Возвращаемся в исходную папку
-        os.chdir(start_dir)
+        run_project(project_dir)
         
         # Итоги
         print_header("🎉 ОБУЧЕНИЕ ЗАВЕРШЕНО!")
@@ -361,7 +294,7 @@ def main():
 ✅ Готовность к GitHub: 100%
 
 📁 Ваш проект здесь:
-{os.path.join(start_dir, project_name)}
+{project_dir}
 
 🚀 ЧТО ДЕЛАТЬ ДАЛЬШЕ:
 
@@ -383,9 +316,4 @@ def main():
         input("\nНажмите Enter для выхода...")
 
 if __name__ == "__main__":
-    # Устанавливаем кодировку для Windows
-    if os.name == 'nt':
-        import io
-        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
-    
     main()
\ No newline at end of file
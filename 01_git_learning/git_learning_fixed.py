@@ -3,10 +3,17 @@
 Git Learning - Исправленная версия для Windows PowerShell
 Простой и понятный туториал
 """
+import functools
 import os
-import subprocess
-import sys
-from datetime import datetime
+
+from lazy_imports import lazy_import
+
+# Модули загружаются при первом обращении
+datetime = lazy_import("datetime")
+file_writer = lazy_import("file_writer")
+git_resolver = lazy_import("git_resolver")
+output_stream = lazy_import("output_stream")
+templates = lazy_import("templates")
 
 def print_header(text):
     """Красивый заголовок"""
@@ -19,25 +26,20 @@ def print_step(step, total, text):
     print(f"\n📝 ШАГ {step}/{total}: {text}")
     print("-"*50)
 
+@functools.lru_cache(maxsize=None)
 def find_git_exe():
-    """Найти git.exe на Windows"""
-    possible_paths = [
-        r"C:\Program Files\Git\bin\git.exe",
-        r"C:\Program Files (x86)\Git\bin\git.exe",
-        r"C:\Program Files\Git\cmd\git.exe",
-    ]
-    
-    for path in possible_paths:
-        if os.path.exists(path):
-            print(f"✅ Найден Git: {path}")
-            return path
+    """Найти git (PATH, GIT_EXE, папки установки); результат запоминается"""
+    path = git_resolver.find_git()
+    if path:
+        print(f"✅ Найден Git: {path}")
+        return path
     
     print("❌ Git не найден!")
     print("Проверьте установку Git или запустите команды вручную.")
     return None
 
-def run_command(command, description, wait=True, use_git=False):
-    """Запуск команды"""
+def run_command(command, description, wait=True, use_git=False, cwd=None):
+    """Запуск команды (cwd - папка, в которой она выполняется)"""
     print(f"\n💻 {description}")
     print(f"   Команда: {command}")
     
@@ -54,20 +56,14 @@ def run_command(command, description, wait=True, use_git=False):
             # Заменяем git на полный путь
             command = command.replace("git ", f'"{git_exe}" ', 1)
         
-        # Запускаем команду
-        result = subprocess.run(
-            command,
-            shell=True,
-            text=True,
-            encoding='utf-8',
-            capture_output=True
-        )
-        
-        if result.stdout:
-            print(f"\n✅ Результат:\n{result.stdout[:500]}...")  # Ограничиваем вывод
+        # Запускаем команду: вывод печатается сразу, но не больше 500 символов
+        output = output_stream.LineLimiter("\n✅ Результат:", limit=500)
+        errors = output_stream.BoundedBuffer(limit=500)
+        output_stream.stream_command(command, output.feed, errors.feed, cwd=cwd)
+        output.close()
         
-        if result.stderr and "warning" not in result.stderr.lower():
-            print(f"\n⚠️  Ошибки:\n{result.stderr[:500]}...")
+        if errors.text and "warning" not in errors.text.lower():
+            print(f"\n⚠️  Ошибки:\n{errors.text}...")
         
         return True
         
@@ -99,7 +95,7 @@ def manual_git_commands():
     
     print("\n💡 Совет: Копируйте команды и вставляйте в терминал (Ctrl+V)")
 
-def interactive_tutorial():
+def interactive_tutorial(base_dir="."):
     """Интерактивный туториал"""
     print_header("ИНТЕРАКТИВНОЕ ОБУЧЕНИЕ GIT")
     
@@ -108,26 +104,26 @@ def interactive_tutorial():
     # Шаг 1: Создание проекта
     print_step(1, 5, "СОЗДАНИЕ ПРОЕКТА")
     
-    if os.path.exists(project_name):
+    if os.path.exists(os.path.join(base_dir, project_name)):
         print(f"📁 Папка '{project_name}' уже существует.")
         choice = input("   Удалить и создать заново? (y/n): ")
         if choice.lower() == 'y':
             import shutil
-            shutil.rmtree(project_name)
+            shutil.rmtree(os.path.join(base_dir, project_name))
         else:
             project_name = input("   Введите новое имя проекта: ")
     
-    os.makedirs(project_name, exist_ok=True)
-    os.chdir(project_name)
+    # Папку не делаем текущей: команды и файлы используют project_dir
+    project_dir = os.path.abspath(os.path.join(base_dir, project_name))
+    os.makedirs(project_dir, exist_ok=True)
     
-    print(f"📂 Рабочая папка: {os.getcwd()}")
+    print(f"📂 Рабочая папка: {project_dir}")
     
     # Шаг 2: Создание файлов
     print_step(2, 5, "СОЗДАНИЕ ФАЙЛОВ")
     
     # README
-    with open("README.md", "w", encoding="utf-8") as f:
-        f.write(f"""# {project_name}
+    file_writer.write_text(os.path.join(project_dir, "README.md"), f"""# {project_name}
 
 Мой первый Git проект.
 
@@ -139,32 +135,17 @@ def interactive_tutorial():
 ardeev1999@gmail.com
 
 ## Дата создания
-{datetime.now().strftime('%Y-%m-%d %H:%M')}
+{datetime.datetime.now().strftime('%Y-%m-%d %H:%M')}
 """)
     print("✅ Создан README.md")
     
     # Python файл
-    with open("main.py", "w", encoding="utf-8") as f:
-        f.write('''#!/usr/bin/env python3
-print("Привет, Git!")
-print("Это мой первый проект под контролем версий")
-
-def calculator(a, b):
-    """Простой калькулятор"""
-    print(f"{a} + {b} = {a + b}")
-    print(f"{a} - {b} = {a - b}")
-    print(f"{a} * {b} = {a * b}")
-    if b != 0:
-        print(f"{a} / {b} = {a / b}")
-
-if __name__ == "__main__":
-    calculator(10, 2)
-''')
+    file_writer.write_text(os.path.join(project_dir, "main.py"), templates.render("fixed/main.py"))
     print("✅ Создан main.py")
     
     # Показываем файлы
     print("\n📄 Файлы в проекте:")
-    run_command("dir", "Список файлов", wait=False)
+    run_command("dir", "Список файлов", wait=False, cwd=project_dir)
     
     # Шаг 3: Инициализация Git
     print_step(3, 5, "ИНИЦИАЛИЗАЦИЯ GIT")
@@ -182,11 +163,10 @@ if __name__ == "__main__":
     print_step(4, 5, "РАБОТА С GIT")
     
     print("\n📊 Проверим что получилось:")
-    run_command("git log --oneline", "История коммитов", wait=False, use_git=True)
+    run_command("git log --oneline", "История коммитов", wait=False, use_git=True, cwd=project_dir)
     
     # Создаем еще файл
-    with open("utils.py", "w", encoding="utf-8") as f:
-        f.write('''#!/usr/bin/env python3
+    file_writer.write_text(os.path.join(project_dir, "utils.py"), '''#!/usr/bin/env python3
 """Вспомогательные функции"""
 
 def greet(name):
@@ -222,7 +202,7 @@ if __name__ == "__main__":
 • Создан проект: {project_name}
 • Созданы файлы: 3
 • Выполнены коммиты: 2
-• Рабочая папка: {os.getcwd()}
+• Рабочая папка: {project_dir}
 
 📚 ИЗУЧЕННЫЕ КОМАНДЫ:
 1. git init - создание репозитория
@@ -245,7 +225,32 @@ if __name__ == "__main__":
     
     # Запускаем наш проект
     print("\n🧪 ЗАПУСК ПРОЕКТА:")
-    run_command("python main.py", "Запуск Python скрипта", wait=False)
+    run_command("python main.py", "Запуск Python скрипта", wait=False, cwd=project_dir)
+
+def check_git_setup():
+    """Автоматическая проверка Git и настроек пользователя"""
+    # Проверяем Git
+    print_header("ПРОВЕРКА GIT")
+    if not find_git_exe():
+        print("❌ Переключаемся на ручной режим...")
+        manual_git_commands()
+        return False
+    
+    # Запускаем автоматические команды
+    run_command("git --version", "Версия Git", wait=False, use_git=True)
+    run_command("git config user.name", "Имя пользователя", wait=False, use_git=True)
+    run_command("git config user.email", "Email", wait=False, use_git=True)
+    
+    print("\n✅ Git настроен корректно!")
+    print("\n🎯 Теперь можете создать проект вручную или продолжить обучение.")
+    return True
+
+# Варианты обучения: выбор в меню -> (описание, функция)
+MENU = {
+    "1": ("🎯 Автоматический туториал (попробуем исправленный скрипт)", check_git_setup),
+    "2": ("🖐️  Ручной режим (вы выполняете команды сами)", manual_git_commands),
+    "3": ("📚 Интерактивный туториал (рекомендуется)", interactive_tutorial),
+}
 
 def main():
     """Главная функция"""
@@ -255,34 +260,16 @@ def main():
     
     print("\n👋 Привет, Вячеслав!")
     print("Выберите вариант обучения:\n")
-    print("1. 🎯 Автоматический туториал (попробуем исправленный скрипт)")
-    print("2. 🖐️  Ручной режим (вы выполняете команды сами)")
-    print("3. 📚 Интерактивный туториал (рекомендуется)")
-    
-    choice = input("\nВаш выбор (1/2/3): ").strip()
-    
-    if choice == "1":
-        # Проверяем Git
-        print_header("ПРОВЕРКА GIT")
-        if not find_git_exe():
-            print("❌ Переключаемся на ручной режим...")
-            manual_git_commands()
+    for key, (title, _) in MENU.items():
+        print(f"{key}. {title}")
+    
+    choice = input(f"\nВаш выбор ({'/'.join(MENU)}): ").strip()
+    
+    if choice in MENU:
+        _, command = MENU[choice]
+        # Без git автоматический режим переключается на ручной и завершается
+        if command() is False:
             return
-        
-        # Запускаем автоматические команды
-        run_command("git --version", "Версия Git", wait=False, use_git=True)
-        run_command("git config user.name", "Имя пользователя", wait=False, use_git=True)
-        run_command("git config user.email", "Email", wait=False, use_git=True)
-        
-        print("\n✅ Git настроен корректно!")
-        print("\n🎯 Теперь можете создать проект вручную или продолжить обучение.")
-        
-    elif choice == "2":
-        manual_git_commands()
-        
-    elif choice == "3":
-        interactive_tutorial()
-        
     else:
         print("❌ Неверный выбор. Запускаю интерактивный режим...")
         interactive_tutorial()
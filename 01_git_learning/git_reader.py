@@ -0,0 +1,1097 @@
+#!/usr/bin/env python3
+"""
+Чтение Git репозитория без запуска git
+Разбирает refs, packed-refs, индекс и объекты (loose и pack) напрямую
+из папки .git. Если встречается что-то неподдерживаемое, выбрасывается
+GitReaderUnsupported и вызывающий код запускает обычный git.
+"""
+import hashlib
+import heapq
+import mmap
+import os
+import re
+import struct
+import subprocess
+import zlib
+from collections import namedtuple
+
+import file_writer
+
+Commit = namedtuple("Commit", "sha tree parents time summary")
+# stat - все 10 полей записи индекса, extended - есть ли расширенные флаги (v3)
+IndexEntry = namedtuple("IndexEntry", "path sha mode size mtime_s mtime_ns stage stat extended")
+Status = namedtuple("Status", "branch initial staged unstaged untracked")
+# commits - не больше limit; limited - обход остановлен на limit
+RepoCheck = namedtuple("RepoCheck", "exists branch head commits limited recent")
+
+OBJ_TYPES = {1: "commit", 2: "tree", 3: "blob", 4: "tag"}
+# Сколько коммитов считать при проверке репозитория
+VERIFY_LIMIT = 1000
+# Кэш количества коммитов: файл в .git и сколько последних коммитов в нём хранить
+COUNT_CACHE_FILE = "COMMIT_COUNT_CACHE"
+COUNT_CACHE_SIZE = 8
+# Кусок packed-refs, в котором за раз считаются строки
+PACKED_REFS_CHUNK = 1 << 20
+OFS_DELTA = 6
+REF_DELTA = 7
+
+
+class GitReaderUnsupported(Exception):
+    """Репозиторий нельзя прочитать напрямую - нужен git"""
+
+
+def find_repository(path="."):
+    """Найти рабочую папку и папку .git (поиск вверх, как это делает git)"""
+    current = os.path.abspath(path)
+    while True:
+        candidate = os.path.join(current, ".git")
+        if os.path.isdir(candidate):
+            return current, candidate
+        if os.path.isfile(candidate):
+            # Рабочие деревья и подмодули: файл вида "gitdir: <путь>"
+            with open(candidate, "r", encoding="utf-8") as f:
+                content = f.read().strip()
+            if not content.startswith("gitdir:"):
+                raise GitReaderUnsupported("Неизвестный формат файла .git")
+            git_dir = content[len("gitdir:"):].strip()
+            return current, os.path.normpath(os.path.join(current, git_dir))
+        parent = os.path.dirname(current)
+        if parent == current:
+            raise GitReaderUnsupported("Git репозиторий не найден")
+        current = parent
+
+
+def read_config(path):
+    """Простой разбор файла конфигурации git: {(секция, подсекция): {ключ: значение}}"""
+    config = {}
+    section = None
+    if not os.path.exists(path):
+        return config
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for raw in f:
+            line = raw.strip()
+            if not line or line[0] in "#;":
+                continue
+            if line.startswith("["):
+                match = re.match(r'\[\s*([^\s\]"]+)(?:\s+"(.*)")?\s*\]', line)
+                if not match:
+                    raise GitReaderUnsupported(f"Не удалось разобрать конфиг: {line}")
+                name, sub = match.groups()
+                section = (name.lower(), sub)
+                config.setdefault(section, {})
+                continue
+            if section is None:
+                continue
+            key, _, value = line.partition("=")
+            config[section][key.strip().lower()] = value.strip().strip('"') if _ else "true"
+    return config
+
+
+class IgnoreRules:
+    """Правила .gitignore (упрощённая, но совместимая с git реализация)"""
+
+    def __init__(self):
+        self.rules = []
+
+    @staticmethod
+    def _translate(pattern):
+        """Перевод шаблона gitignore в регулярное выражение"""
+        result = []
+        i = 0
+        while i < len(pattern):
+            if pattern.startswith("**/", i):
+                result.append("(?:.*/)?")
+                i += 3
+            elif pattern.startswith("/**", i) and i + 3 == len(pattern):
+                result.append("/.*")
+                i += 3
+            elif pattern.startswith("**", i):
+                result.append(".*")
+                i += 2
+            elif pattern[i] == "*":
+                result.append("[^/]*")
+                i += 1
+            elif pattern[i] == "?":
+                result.append("[^/]")
+                i += 1
+            elif pattern[i] == "[":
+                end = pattern.find("]", i + 1)
+                if end == -1:
+                    result.append(re.escape("["))
+                    i += 1
+                else:
+                    body = pattern[i + 1:end]
+                    if body.startswith("!"):
+                        body = "^" + body[1:]
+                    result.append(f"[{body}]")
+                    i = end + 1
+            elif pattern[i] == "\\" and i + 1 < len(pattern):
+                result.append(re.escape(pattern[i + 1]))
+                i += 2
+            else:
+                result.append(re.escape(pattern[i]))
+                i += 1
+        return "".join(result)
+
+    def add_pattern(self, line, base=""):
+        """Добавить одно правило; base - папка файла .gitignore"""
+        line = line.rstrip("\n").rstrip("\r")
+        if not line.strip() or line.startswith("#"):
+            return
+        line = line.rstrip(" ")
+        negate = line.startswith("!")
+        if negate:
+            line = line[1:]
+        if line.startswith("\\"):
+            line = line[1:]
+        dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        if not line:
+            return
+        anchored = "/" in line
+        regex = re.compile("^" + self._translate(line.lstrip("/")) + "$")
+        self.rules.append((base, regex, negate, dir_only, anchored))
+
+    def add_file(self, path, base=""):
+        """Загрузить правила из файла (если он есть)"""
+        if not os.path.isfile(path):
+            return
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                self.add_pattern(line, base)
+
+    def is_ignored(self, relpath, is_dir=False):
+        """Проверка пути (относительно корня, через "/"); родители не проверяются"""
+        ignored = False
+        name = relpath.rsplit("/", 1)[-1]
+        for base, regex, negate, dir_only, anchored in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if base:
+                if not relpath.startswith(base + "/"):
+                    continue
+                local = relpath[len(base) + 1:]
+            else:
+                local = relpath
+            if regex.match(local if anchored else name):
+                ignored = not negate
+        return ignored
+
+
+class PackFile:
+    """Pack-файл и его индекс (.idx версии 2)"""
+
+    def __init__(self, idx_path):
+        self.idx_path = idx_path
+        self.pack_path = idx_path[:-4] + ".pack"
+        with open(idx_path, "rb") as f:
+            idx = f.read()
+        if idx[:4] != b"\377tOc" or struct.unpack(">I", idx[4:8])[0] != 2:
+            raise GitReaderUnsupported(f"Неподдерживаемый формат индекса: {idx_path}")
+        self.fanout = struct.unpack(">256I", idx[8:8 + 1024])
+        self.count = self.fanout[255]
+        names_start = 8 + 1024
+        self.names = idx[names_start:names_start + 20 * self.count]
+        offsets_start = names_start + 24 * self.count
+        self.offsets = idx[offsets_start:offsets_start + 4 * self.count]
+        self.large_offsets = idx[offsets_start + 4 * self.count:]
+        self._pack = None
+
+    def find(self, binsha):
+        """Смещение объекта в pack-файле или None"""
+        first = binsha[0]
+        lo = self.fanout[first - 1] if first else 0
+        hi = self.fanout[first]
+        while lo < hi:
+            mid = (lo + hi) // 2
+            name = self.names[mid * 20:mid * 20 + 20]
+            if name < binsha:
+                lo = mid + 1
+            elif name > binsha:
+                hi = mid
+            else:
+                offset = struct.unpack(">I", self.offsets[mid * 4:mid * 4 + 4])[0]
+                if offset & 0x80000000:
+                    pos = (offset & 0x7FFFFFFF) * 8
+                    offset = struct.unpack(">Q", self.large_offsets[pos:pos + 8])[0]
+                return offset
+        return None
+
+    def iter_shas(self):
+        """Все объекты пака (hex)"""
+        for i in range(self.count):
+            yield self.names[i * 20:i * 20 + 20].hex()
+
+    @property
+    def data(self):
+        if self._pack is None:
+            with open(self.pack_path, "rb") as f:
+                self._pack = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._pack
+
+    def read_at(self, offset, reader):
+        """Прочитать объект по смещению (с применением дельт)"""
+        data = self.data
+        pos = offset
+        byte = data[pos]
+        pos += 1
+        obj_type = (byte >> 4) & 7
+        size = byte & 0x0F
+        shift = 4
+        while byte & 0x80:
+            byte = data[pos]
+            pos += 1
+            size |= (byte & 0x7F) << shift
+            shift += 7
+
+        if obj_type == OFS_DELTA:
+            byte = data[pos]
+            pos += 1
+            base_distance = byte & 0x7F
+            while byte & 0x80:
+                byte = data[pos]
+                pos += 1
+                base_distance = ((base_distance + 1) << 7) | (byte & 0x7F)
+            base_type, base = self.read_at(offset - base_distance, reader)
+            return base_type, apply_delta(base, self._inflate(pos, size))
+        if obj_type == REF_DELTA:
+            base_sha = bytes(data[pos:pos + 20]).hex()
+            base_type, base = reader.read_object(base_sha)
+            return base_type, apply_delta(base, self._inflate(pos + 20, size))
+        if obj_type not in OBJ_TYPES:
+            raise GitReaderUnsupported(f"Неизвестный тип объекта в паке: {obj_type}")
+        return OBJ_TYPES[obj_type], self._inflate(pos, size)
+
+    def _inflate(self, pos, size):
+        """Распаковка zlib-потока из пака"""
+        decompressor = zlib.decompressobj()
+        chunks = []
+        total = 0
+        chunk_size = max(size, 4096)
+        while not decompressor.eof:
+            chunk = decompressor.decompress(self.data[pos:pos + chunk_size])
+            chunks.append(chunk)
+            total += len(chunk)
+            pos += chunk_size
+            if pos >= len(self.data) and not decompressor.eof:
+                raise GitReaderUnsupported("Повреждённый pack-файл")
+        return b"".join(chunks)
+
+    def close(self):
+        if self._pack is not None:
+            self._pack.close()
+            self._pack = None
+
+
+def _delta_varint(delta, pos):
+    value = 0
+    shift = 0
+    while True:
+        byte = delta[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        shift += 7
+        if not byte & 0x80:
+            return value, pos
+
+
+def apply_delta(base, delta):
+    """Применение git-дельты к базовому объекту"""
+    src_size, pos = _delta_varint(delta, 0)
+    dst_size, pos = _delta_varint(delta, pos)
+    if src_size != len(base):
+        raise GitReaderUnsupported("Размер базового объекта не совпадает с дельтой")
+    out = bytearray()
+    while pos < len(delta):
+        op = delta[pos]
+        pos += 1
+        if op & 0x80:
+            offset = 0
+            size = 0
+            for i in range(4):
+                if op & (1 << i):
+                    offset |= delta[pos] << (8 * i)
+                    pos += 1
+            for i in range(3):
+                if op & (0x10 << i):
+                    size |= delta[pos] << (8 * i)
+                    pos += 1
+            if size == 0:
+                size = 0x10000
+            out += base[offset:offset + size]
+        elif op:
+            out += delta[pos:pos + op]
+            pos += op
+        else:
+            raise GitReaderUnsupported("Некорректная инструкция дельты")
+    if len(out) != dst_size:
+        raise GitReaderUnsupported("Размер результата дельты не совпадает")
+    return bytes(out)
+
+
+def hash_blob(data):
+    """SHA-1 содержимого как blob-объекта git"""
+    sha = hashlib.sha1(b"blob %d\0" % len(data))
+    sha.update(data)
+    return sha.hexdigest()
+
+
+class PackedRefs:
+    """
+    Файл packed-refs через mmap
+    git пишет его отсортированным по имени (заголовок "# pack-refs with: ...
+    sorted"), поэтому поиск ссылки и диапазона ссылок по префиксу - двоичный
+    поиск по строкам, без чтения всего файла. Неотсортированный файл
+    читается построчно.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size:
+                self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                self.data = b""
+        self.size = len(self.data)
+        self.start = 0
+        self.sorted = False
+        if self.data[:1] == b"#":
+            self.start = self._next_line(0)
+            self.sorted = b" sorted" in self.data[:self.start]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _next_line(self, pos):
+        """Начало строки, следующей за строкой с позицией pos"""
+        end = self.data.find(b"\n", pos)
+        return self.size if end == -1 else end + 1
+
+    def _ref_line(self, pos):
+        """Начало первой строки ссылки (не "^") в позиции pos или дальше"""
+        if pos > self.start and self.data[pos - 1:pos] != b"\n":
+            pos = self._next_line(pos)
+        while pos < self.size and self.data[pos:pos + 1] == b"^":
+            pos = self._next_line(pos)
+        return pos
+
+    def _line(self, pos):
+        """(имя, sha) строки ссылки; "<40 символов sha> <имя>" (только SHA-1)"""
+        end = self._next_line(pos)
+        name = self.data[pos + 41:end].rstrip(b"\r\n")
+        return name.decode("utf-8", errors="replace"), self.data[pos:pos + 40].decode("ascii")
+
+    def _bisect(self, key):
+        """Начало первой строки ссылки с именем >= key (байты)"""
+        lo, hi = self.start, self.size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            pos = self._ref_line(mid)
+            end = self._next_line(pos)
+            if pos < self.size and self.data[pos + 41:end].rstrip(b"\r\n") < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return self._ref_line(lo)
+
+    def _range(self, prefix):
+        """Границы строк с именами на prefix (в отсортированном файле)"""
+        key = prefix.encode("utf-8")
+        # 0xff не встречается в UTF-8, поэтому key + 0xff больше любого имени на prefix
+        return self._bisect(key), self._bisect(key + b"\xff")
+
+    def iter(self, prefix=""):
+        """Ссылки с именем на prefix: (имя, sha), по одной строке"""
+        begin, end = self._range(prefix) if self.sorted else (self.start, self.size)
+        pos = begin
+        while pos < end:
+            if self.data[pos:pos + 1] not in (b"^", b"#"):
+                name, sha = self._line(pos)
+                if name.startswith(prefix):
+                    yield name, sha
+            pos = self._next_line(pos)
+
+    def lookup(self, name):
+        """SHA ссылки или None"""
+        if not self.sorted:
+            return next((sha for ref_name, sha in self.iter(name) if ref_name == name), None)
+        pos = self._bisect(name.encode("utf-8"))
+        if pos < self.size:
+            ref_name, sha = self._line(pos)
+            if ref_name == name:
+                return sha
+        return None
+
+    def count(self, prefix=""):
+        """
+        Количество ссылок с именем на prefix
+        В отсортированном файле считаются переводы строк в диапазоне (кусками
+        по PACKED_REFS_CHUNK байт) за вычетом строк "^" с раскрытыми тегами.
+        """
+        if not self.sorted:
+            return sum(1 for _ in self.iter(prefix))
+        begin, end = self._range(prefix)
+        total = 0
+        for pos in range(begin, end, PACKED_REFS_CHUNK):
+            stop = min(pos + PACKED_REFS_CHUNK, end)
+            chunk = self.data[pos:min(stop + 1, end)]
+            total += chunk.count(b"\n", 0, stop - pos) - chunk.count(b"\n^")
+        if end > begin and self.data[end - 1:end] != b"\n":
+            total += 1  # последняя строка файла без перевода строки
+        return total
+
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+
+
+class GitRepoReader:
+    """Чтение репозитория напрямую из папки .git"""
+
+    def __init__(self, path="."):
+        self.worktree, self.git_dir = find_repository(path)
+        self.common_dir = self.git_dir
+        commondir_file = os.path.join(self.git_dir, "commondir")
+        if os.path.isfile(commondir_file):
+            with open(commondir_file, "r", encoding="utf-8") as f:
+                self.common_dir = os.path.normpath(os.path.join(self.git_dir, f.read().strip()))
+        self.config = read_config(os.path.join(self.common_dir, "config"))
+        extensions = self.config.get(("extensions", None), {})
+        if extensions.get("objectformat", "sha1").lower() != "sha1":
+            raise GitReaderUnsupported("Поддерживаются только SHA-1 репозитории")
+        self._packs = None
+        self._commits = {}
+
+    # ---------- ссылки ----------
+
+    def _packed_refs(self):
+        """PackedRefs или None, если файла packed-refs нет"""
+        try:
+            return PackedRefs(os.path.join(self.common_dir, "packed-refs"))
+        except FileNotFoundError:
+            return None
+
+    def _iter_loose_refs(self, prefix):
+        """Файлы ссылок в refs/ с именем на prefix: (имя, путь)"""
+        directory, _, _ = prefix.rpartition("/")
+        stack = [directory] if directory else ["refs"]
+        while stack:
+            current = stack.pop()
+            try:
+                entries = os.scandir(os.path.join(self.common_dir, *current.split("/")))
+            except (FileNotFoundError, NotADirectoryError):
+                continue
+            with entries:
+                for entry in entries:
+                    name = f"{current}/{entry.name}"
+                    if entry.is_dir(follow_symlinks=False):
+                        if name.startswith(prefix) or prefix.startswith(name + "/"):
+                            stack.append(name)
+                    elif name.startswith(prefix) and not entry.name.endswith(".lock"):
+                        yield name, entry.path
+
+    def iter_refs(self, prefix="refs/", resolve=True):
+        """
+        Ссылки с именем на prefix (например, "refs/heads/"): (имя, sha)
+        Генератор без общей сортировки: сначала loose-ссылки, затем packed-refs
+        (loose-ссылка с тем же именем важнее). В памяти держатся только имена
+        loose-ссылок. resolve=False - не читать файлы ссылок (sha будет None).
+        """
+        loose = set()
+        for name, path in self._iter_loose_refs(prefix):
+            loose.add(name)
+            sha = None
+            if resolve:
+                with open(path, "r", encoding="utf-8") as f:
+                    value = f.read().strip()
+                sha = self.read_ref(value[4:].strip()) if value.startswith("ref:") else value
+            yield name, sha
+        packed = self._packed_refs()
+        if packed is None:
+            return
+        with packed:
+            for name, sha in packed.iter(prefix):
+                if name not in loose:
+                    yield name, sha
+
+    def count_refs(self, prefix="refs/"):
+        """
+        Количество ссылок с именем на prefix
+        Файлы loose-ссылок не читаются, строки packed-refs не разбираются.
+        """
+        loose = {name for name, _ in self._iter_loose_refs(prefix)}
+        packed = self._packed_refs()
+        if packed is None:
+            return len(loose)
+        with packed:
+            if not packed.sorted:
+                return len(loose) + sum(1 for name, _ in packed.iter(prefix) if name not in loose)
+            # loose-ссылка может быть и в packed-refs (старое значение)
+            shadowed = sum(1 for name in loose if packed.lookup(name) is not None)
+            return len(loose) + packed.count(prefix) - shadowed
+
+    def _ref_path(self, name):
+        # HEAD и другие псевдо-ссылки живут в git_dir, остальное - в общей папке
+        base = self.git_dir if "/" not in name else self.common_dir
+        return os.path.join(base, *name.split("/"))
+
+    def read_ref(self, name, depth=0):
+        """SHA коммита, на который указывает ссылка (или None)"""
+        if depth > 5:
+            raise GitReaderUnsupported("Слишком длинная цепочка символьных ссылок")
+        path = self._ref_path(name)
+        if os.path.isfile(path):
+            with open(path, "r", encoding="utf-8") as f:
+                value = f.read().strip()
+            if value.startswith("ref:"):
+                return self.read_ref(value[4:].strip(), depth + 1)
+            return value or None
+        packed = self._packed_refs()
+        if packed is None:
+            return None
+        with packed:
+            return packed.lookup(name)
+
+    def head(self):
+        """Текущая ветка (полное имя или None при detached HEAD) и SHA"""
+        with open(os.path.join(self.git_dir, "HEAD"), "r", encoding="utf-8") as f:
+            value = f.read().strip()
+        if value.startswith("ref:"):
+            ref = value[4:].strip()
+            return ref, self.read_ref(ref)
+        return None, value
+
+    def current_branch(self):
+        """Короткое имя текущей ветки"""
+        ref, _ = self.head()
+        if ref is None:
+            return None
+        return ref[len("refs/heads/"):] if ref.startswith("refs/heads/") else ref
+
+    def branches(self):
+        """Список локальных веток (короткие имена, по алфавиту)"""
+        return sorted(name[len("refs/heads/"):] for name, _ in self.iter_refs("refs/heads/", resolve=False))
+
+    # ---------- объекты ----------
+
+    @property
+    def packs(self):
+        if self._packs is None:
+            self._packs = []
+            pack_dir = os.path.join(self.common_dir, "objects", "pack")
+            if os.path.isdir(pack_dir):
+                for name in sorted(os.listdir(pack_dir)):
+                    if name.endswith(".idx"):
+                        self._packs.append(PackFile(os.path.join(pack_dir, name)))
+        return self._packs
+
+    def read_object(self, sha):
+        """Тип и содержимое объекта"""
+        path = os.path.join(self.common_dir, "objects", sha[:2], sha[2:])
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                raw = zlib.decompress(f.read())
+            header, _, body = raw.partition(b"\0")
+            obj_type = header.split(b" ", 1)[0].decode("ascii")
+            return obj_type, body
+
+        binsha = bytes.fromhex(sha)
+        for pack in self.packs:
+            offset = pack.find(binsha)
+            if offset is not None:
+                return pack.read_at(offset, self)
+
+        if os.path.exists(os.path.join(self.common_dir, "objects", "info", "alternates")):
+            raise GitReaderUnsupported("Альтернативные хранилища объектов не поддерживаются")
+        raise GitReaderUnsupported(f"Объект {sha} не найден")
+
+    def has_object(self, sha):
+        """Есть ли объект в репозитории"""
+        try:
+            self.read_object(sha)
+            return True
+        except (GitReaderUnsupported, ValueError):
+            return False
+
+    def commit(self, sha):
+        """Разбор коммита (с кэшем)"""
+        cached = self._commits.get(sha)
+        if cached is not None:
+            return cached
+        obj_type, body = self.read_object(sha)
+        if obj_type != "commit":
+            raise GitReaderUnsupported(f"{sha} не является коммитом")
+        headers, _, message = body.partition(b"\n\n")
+        tree = None
+        parents = []
+        commit_time = 0
+        for line in headers.split(b"\n"):
+            if line.startswith(b"tree "):
+                tree = line[5:].decode("ascii")
+            elif line.startswith(b"parent "):
+                parents.append(line[7:].decode("ascii"))
+            elif line.startswith(b"committer "):
+                commit_time = int(line.rsplit(b" ", 2)[1])
+        summary = message.split(b"\n", 1)[0].decode("utf-8", errors="replace")
+        commit = Commit(sha, tree, tuple(parents), commit_time, summary)
+        self._commits[sha] = commit
+        return commit
+
+    def iter_log(self, start=None):
+        """Коммиты в порядке git log: от новых к старым по дате"""
+        if start is None:
+            _, start = self.head()
+        if not start:
+            return
+        seen = {start}
+        queue = [(-self.commit(start).time, 0, start)]
+        counter = 1
+        while queue:
+            _, _, sha = heapq.heappop(queue)
+            commit = self.commit(sha)
+            yield commit
+            for parent in commit.parents:
+                if parent not in seen:
+                    seen.add(parent)
+                    heapq.heappush(queue, (-self.commit(parent).time, counter, parent))
+                    counter += 1
+
+    def count_commits(self, start=None, limit=None):
+        """
+        Количество коммитов, достижимых из start (как git rev-list --count)
+        limit - остановить обход, насчитав столько коммитов
+        """
+        if start is None:
+            _, start = self.head()
+        if not start:
+            return 0
+        seen = {start}
+        stack = [start]
+        while stack and (limit is None or len(seen) < limit):
+            for parent in self.commit(stack.pop()).parents:
+                if parent not in seen:
+                    seen.add(parent)
+                    stack.append(parent)
+        return len(seen) if limit is None else min(len(seen), limit)
+
+    def count_from_known(self, start, known):
+        """
+        Количество коммитов в start, если для некоторых коммитов оно уже
+        известно (known - {коммит: количество}). Обход идёт от start и
+        останавливается на известных коммитах, поэтому даты коммитов не важны.
+        Результат точный, только если все пути привели к одному и тому же
+        известному коммиту; иначе (история переписана, слияние разошедшихся
+        веток) возвращается None - нужен полный подсчёт.
+        """
+        if start in known:
+            return known[start]
+        seen = {start}
+        stack = [start]
+        reached = set()
+        while stack:
+            parents = self.commit(stack.pop()).parents
+            if not parents:
+                return None
+            for parent in parents:
+                if parent in known:
+                    reached.add(parent)
+                elif parent not in seen:
+                    seen.add(parent)
+                    stack.append(parent)
+            if len(reached) > 1:
+                return None
+        base, = reached
+        return known[base] + len(seen)
+
+    def cached_count_commits(self):
+        """
+        Количество коммитов в HEAD с кэшем в .git/COMMIT_COUNT_CACHE
+        Кэш хранит количества для нескольких последних HEAD. Если HEAD ушёл
+        вперёд от одного из них, обходятся только новые коммиты; после
+        переписывания истории выполняется полный обход.
+        """
+        _, head = self.head()
+        if not head:
+            return 0
+        cache = self._read_count_cache()
+        if head in cache:
+            return cache[head]
+        count = None
+        if cache:
+            try:
+                count = self.count_from_known(head, cache)
+            except (GitReaderUnsupported, ValueError, zlib.error):
+                count = None
+        if count is None:
+            count = self.count_commits(head)
+        cache[head] = count
+        self._write_count_cache(cache)
+        return count
+
+    def _count_cache_path(self):
+        return os.path.join(self.git_dir, COUNT_CACHE_FILE)
+
+    def _read_count_cache(self):
+        """{коммит: количество} в порядке сохранения"""
+        cache = {}
+        try:
+            with open(self._count_cache_path(), "r", encoding="ascii") as f:
+                for line in f:
+                    sha, _, count = line.strip().partition(" ")
+                    if len(sha) == 40 and count.isdigit():
+                        cache.pop(sha, None)
+                        cache[sha] = int(count)
+        except (OSError, ValueError):
+            return {}
+        return cache
+
+    def _write_count_cache(self, cache):
+        entries = list(cache.items())[-COUNT_CACHE_SIZE:]
+        try:
+            file_writer.write_text(self._count_cache_path(),
+                                   "".join(f"{sha} {count}\n" for sha, count in entries))
+        except OSError:
+            pass  # репозиторий только для чтения - просто без кэша
+
+    def tree_files(self, tree_sha, prefix=""):
+        """Все файлы дерева: {путь: (режим, sha)}"""
+        files = {}
+        _, body = self.read_object(tree_sha)
+        pos = 0
+        while pos < len(body):
+            space = body.index(b" ", pos)
+            null = body.index(b"\0", space)
+            mode = body[pos:space].decode("ascii")
+            name = body[space + 1:null].decode("utf-8", errors="surrogateescape")
+            sha = body[null + 1:null + 21].hex()
+            pos = null + 21
+            path = prefix + name
+            if mode == "40000":
+                files.update(self.tree_files(sha, path + "/"))
+            elif mode == "160000":
+                raise GitReaderUnsupported("Подмодули не поддерживаются")
+            else:
+                files[path] = (mode, sha)
+        return files
+
+    # ---------- индекс и состояние ----------
+
+    def read_index(self):
+        """Разбор файла индекса (версии 2 и 3)"""
+        path = os.path.join(self.git_dir, "index")
+        if not os.path.exists(path):
+            return []
+        with open(path, "rb") as f:
+            data = f.read()
+        if data[:4] != b"DIRC":
+            raise GitReaderUnsupported("Некорректный файл индекса")
+        version, count = struct.unpack(">II", data[4:12])
+        if version not in (2, 3):
+            raise GitReaderUnsupported(f"Индекс версии {version} не поддерживается")
+        entries = []
+        pos = 12
+        for _ in range(count):
+            stat = struct.unpack(">10I", data[pos:pos + 40])
+            (_, _, mtime_s, mtime_ns, _, _, mode, _, _, size) = stat
+            sha = data[pos + 40:pos + 60].hex()
+            flags = struct.unpack(">H", data[pos + 60:pos + 62])[0]
+            header = 62
+            extended = version == 3 and bool(flags & 0x4000)
+            if extended:
+                header += 2
+            name_end = data.index(b"\0", pos + header)
+            name = data[pos + header:name_end].decode("utf-8", errors="surrogateescape")
+            stage = (flags >> 12) & 3
+            if mode == 0o160000:
+                raise GitReaderUnsupported("Подмодули не поддерживаются")
+            entries.append(IndexEntry(name, sha, mode, size, mtime_s, mtime_ns, stage, stat, extended))
+            # Записи выровнены по 8 байт
+            entry_len = name_end - pos + 1
+            pos += (entry_len + 7) // 8 * 8
+        if data.find(b"link", pos) == pos:
+            raise GitReaderUnsupported("Разделённый индекс не поддерживается")
+        return entries
+
+    def _worktree_changed(self, entry):
+        """Изменён ли файл рабочей папки относительно записи индекса"""
+        full = os.path.join(self.worktree, *entry.path.split("/"))
+        try:
+            st = os.stat(full)
+        except FileNotFoundError:
+            return "deleted"
+        mtime_s, mtime_ns = divmod(st.st_mtime_ns, 1_000_000_000)
+        if st.st_size == entry.size and mtime_s == entry.mtime_s and mtime_ns == entry.mtime_ns:
+            return None
+        with open(full, "rb") as f:
+            data = f.read()
+        if hash_blob(data) == entry.sha:
+            return None
+        # core.autocrlf: в индексе LF, в рабочей папке CRLF
+        if b"\r\n" in data and hash_blob(data.replace(b"\r\n", b"\n")) == entry.sha:
+            return None
+        return "modified"
+
+    def ignore_rules(self):
+        """Правила игнорирования: info/exclude и корневой .gitignore"""
+        core = self.config.get(("core", None), {})
+        if "excludesfile" in core:
+            raise GitReaderUnsupported("core.excludesFile не поддерживается")
+        rules = IgnoreRules()
+        rules.add_file(os.path.join(self.common_dir, "info", "exclude"))
+        rules.add_file(os.path.join(self.worktree, ".gitignore"))
+        return rules
+
+    def _untracked(self, tracked, tracked_dirs, rules, rel=""):
+        """Неотслеживаемые файлы; папки без отслеживаемых файлов - одной строкой"""
+        result = []
+        directory = os.path.join(self.worktree, *rel.split("/")) if rel else self.worktree
+        if rel:
+            rules.add_file(os.path.join(directory, ".gitignore"), rel)
+        with os.scandir(directory) as it:
+            entries = sorted(it, key=lambda e: e.name)
+        for entry in entries:
+            if not rel and entry.name == ".git":
+                continue
+            path = f"{rel}/{entry.name}" if rel else entry.name
+            is_dir = entry.is_dir(follow_symlinks=False)
+            if rules.is_ignored(path, is_dir):
+                continue
+            if is_dir:
+                if path in tracked_dirs:
+                    result.extend(self._untracked(tracked, tracked_dirs, rules, path))
+                elif self._has_visible_files(path, rules):
+                    result.append(path + "/")
+            elif path not in tracked:
+                result.append(path)
+        return result
+
+    def _has_visible_files(self, rel, rules):
+        """Есть ли в папке хоть один неигнорируемый файл"""
+        directory = os.path.join(self.worktree, *rel.split("/"))
+        rules.add_file(os.path.join(directory, ".gitignore"), rel)
+        with os.scandir(directory) as it:
+            for entry in it:
+                path = f"{rel}/{entry.name}"
+                is_dir = entry.is_dir(follow_symlinks=False)
+                if rules.is_ignored(path, is_dir):
+                    continue
+                if not is_dir or self._has_visible_files(path, rules):
+                    return True
+        return False
+
+    def status(self, pending=()):
+        """
+        Состояние репозитория: проиндексированные, изменённые, новые файлы
+        pending - пути, для которых git add отложен: они показываются так,
+        будто текущее содержимое рабочей папки уже добавлено в индекс.
+        """
+        ref, head_sha = self.head()
+        if ref is None:
+            raise GitReaderUnsupported("Detached HEAD не поддерживается")
+        branch = ref[len("refs/heads/"):]
+        if ("branch", branch) in self.config and "remote" in self.config[("branch", branch)]:
+            raise GitReaderUnsupported("Ветки с upstream не поддерживаются")
+
+        index = self.read_index()
+        if any(entry.stage for entry in index):
+            raise GitReaderUnsupported("Конфликты слияния не поддерживаются")
+        head_files = self.tree_files(self.commit(head_sha).tree) if head_sha else {}
+
+        pending = {path.replace(os.sep, "/").removeprefix("./") for path in pending}
+        staged = []
+        unstaged = []
+        tracked = {}
+        for path in sorted(pending):
+            try:
+                with open(os.path.join(self.worktree, *path.split("/")), "rb") as f:
+                    data = f.read()
+            except (FileNotFoundError, IsADirectoryError):
+                raise GitReaderUnsupported(f"Отложенный git add для отсутствующего файла: {path}")
+            tracked[path] = None
+            if path not in head_files:
+                staged.append(("new file", path))
+            elif head_files[path][1] != hash_blob(data) and (
+                    b"\r\n" not in data or head_files[path][1] != hash_blob(data.replace(b"\r\n", b"\n"))):
+                staged.append(("modified", path))
+        for entry in index:
+            if entry.path in pending:
+                continue
+            tracked[entry.path] = entry
+            if entry.path not in head_files:
+                staged.append(("new file", entry.path))
+            elif head_files[entry.path][1] != entry.sha:
+                staged.append(("modified", entry.path))
+            change = self._worktree_changed(entry)
+            if change:
+                unstaged.append((change, entry.path))
+        for path in head_files:
+            if path not in tracked:
+                staged.append(("deleted", path))
+        staged.sort(key=lambda item: item[1])
+
+        tracked_dirs = set()
+        for path in tracked:
+            parts = path.split("/")[:-1]
+            for i in range(1, len(parts) + 1):
+                tracked_dirs.add("/".join(parts[:i]))
+        untracked = self._untracked(tracked, tracked_dirs, self.ignore_rules())
+        return Status(branch, head_sha is None, staged, unstaged, untracked)
+
+    def format_status(self, pending=()):
+        """Вывод в формате обычного git status"""
+        status = self.status(pending)
+        lines = [f"On branch {status.branch}"]
+        if status.initial:
+            lines += ["", "No commits yet", ""]
+        if status.staged:
+            lines.append("Changes to be committed:")
+            if status.initial:
+                lines.append('  (use "git rm --cached <file>..." to unstage)')
+            else:
+                lines.append('  (use "git restore --staged <file>..." to unstage)')
+            lines += [f"\t{kind + ':':<12}{path}" for kind, path in status.staged]
+            lines.append("")
+        if status.unstaged:
+            lines.append("Changes not staged for commit:")
+            if any(kind == "deleted" for kind, _ in status.unstaged):
+                lines.append('  (use "git add/rm <file>..." to update what will be committed)')
+            else:
+                lines.append('  (use "git add <file>..." to update what will be committed)')
+            lines.append('  (use "git restore <file>..." to discard changes in working directory)')
+            lines += [f"\t{kind + ':':<12}{path}" for kind, path in status.unstaged]
+            lines.append("")
+        if status.untracked:
+            lines += ["Untracked files:",
+                      '  (use "git add <file>..." to include in what will be committed)']
+            lines += [f"\t{path}" for path in status.untracked]
+            lines.append("")
+        if status.staged:
+            pass
+        elif status.unstaged:
+            lines.append('no changes added to commit (use "git add" and/or "git commit -a")')
+        elif status.untracked:
+            lines.append('nothing added to commit but untracked files present (use "git add" to track)')
+        elif status.initial:
+            lines.append('nothing to commit (create/copy files and use "git add" to track)')
+        else:
+            lines.append("nothing to commit, working tree clean")
+        return "\n".join(lines) + "\n"
+
+    def format_log_oneline(self):
+        """Вывод как у git log --oneline"""
+        return "".join(f"{c.sha[:7]} {c.summary}\n" for c in self.iter_log())
+
+    def format_branches(self):
+        """Вывод как у git branch"""
+        current = self.current_branch()
+        return "".join(f"{'*' if name == current else ' '} {name}\n" for name in self.branches())
+
+    def close(self):
+        for pack in self._packs or []:
+            pack.close()
+
+
+# Команды, на которые можно ответить без запуска git
+READ_ONLY_COMMANDS = {
+    "git status": GitRepoReader.format_status,
+    "git log --oneline": GitRepoReader.format_log_oneline,
+    "git branch": GitRepoReader.format_branches,
+    "git rev-list --count HEAD": lambda reader: f"{reader.cached_count_commits()}\n",
+}
+
+
+def answer(command, cwd=".", pending=()):
+    """
+    Ответ на команду только для чтения без запуска git
+    pending - файлы с отложенным git add (учитываются в git status).
+    Возвращает subprocess.CompletedProcess или None, если нужен настоящий git
+    """
+    handler = READ_ONLY_COMMANDS.get(" ".join(command.split()))
+    if handler is None:
+        return None
+    try:
+        reader = GitRepoReader(cwd)
+    except (GitReaderUnsupported, OSError):
+        return None
+    try:
+        if command.split()[1] in ("log", "rev-list") and reader.head()[1] is None:
+            return None  # пустой репозиторий: пусть git выведет своё сообщение
+        if pending and handler is GitRepoReader.format_status:
+            return subprocess.CompletedProcess(command, 0, reader.format_status(pending), "")
+        return subprocess.CompletedProcess(command, 0, handler(reader), "")
+    except (GitReaderUnsupported, OSError, ValueError, zlib.error):
+        return None
+    finally:
+        reader.close()
+
+
+def count_commits(cwd="."):
+    """Количество коммитов в HEAD: напрямую из .git (с кэшем) или через git rev-list"""
+    result = answer("git rev-list --count HEAD", cwd)
+    if result is None:
+        result = subprocess.run(["git", "rev-list", "--count", "HEAD"],
+                                capture_output=True, text=True, cwd=cwd)
+    return result.stdout.strip()
+
+
+def count_branches(cwd="."):
+    """Количество локальных веток: напрямую из .git или через git for-each-ref"""
+    try:
+        reader = GitRepoReader(cwd)
+    except (GitReaderUnsupported, OSError):
+        result = subprocess.run(["git", "for-each-ref", "--format=%(refname)", "refs/heads/"],
+                                capture_output=True, text=True, cwd=cwd)
+        return len(result.stdout.splitlines())
+    try:
+        return reader.count_refs("refs/heads/")
+    finally:
+        reader.close()
+
+
+def _verify_with_git(path, limit, recent):
+    """verify_repository через git (репозиторий нельзя прочитать напрямую)"""
+    def git(*args):
+        return subprocess.run(["git", *args], capture_output=True, text=True,
+                              encoding="utf-8", errors="replace", cwd=path)
+    head = git("rev-parse", "--verify", "--quiet", "HEAD").stdout.strip() or None
+    branch = git("symbolic-ref", "--short", "--quiet", "HEAD").stdout.strip() or None
+    if head is None:
+        return RepoCheck(True, branch, None, 0, False, ())
+    commits = int(git("rev-list", "--count", f"--max-count={limit}", "HEAD").stdout.strip() or 0)
+    lines = git("log", "--format=%H %s", f"-n{recent}", "HEAD").stdout.splitlines()
+    latest = tuple(Commit(sha, None, (), 0, summary)
+                   for sha, _, summary in (line.partition(" ") for line in lines))
+    return RepoCheck(True, branch, head, commits, commits >= limit, latest)
+
+
+def verify_repository(path=".", limit=VERIFY_LIMIT, recent=3):
+    """
+    Проверка учебного репозитория: есть ли .git именно в path, текущая ветка,
+    коммит HEAD, число коммитов (обход останавливается на limit) и несколько
+    последних коммитов. Полная история не читается и не выводится.
+    """
+    path = os.path.abspath(path)
+    if not os.path.exists(os.path.join(path, ".git")):
+        return RepoCheck(False, None, None, 0, False, ())
+    try:
+        reader = GitRepoReader(path)
+    except (GitReaderUnsupported, OSError):
+        return _verify_with_git(path, limit, recent)
+    try:
+        branch = reader.current_branch()
+        _, head = reader.head()
+        if head is None:
+            return RepoCheck(True, branch, None, 0, False, ())
+        commits = reader.count_commits(head, limit)
+        latest = []
+        for commit in reader.iter_log(head):
+            if len(latest) >= recent:
+                break
+            latest.append(commit)
+        return RepoCheck(True, branch, head, commits, commits >= limit, tuple(latest))
+    except (GitReaderUnsupported, OSError, ValueError, zlib.error):
+        return _verify_with_git(path, limit, recent)
+    finally:
+        reader.close()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Поиск исполняемого файла git
+Порядок поиска: переменная окружения GIT_EXE, PATH, известные папки
+установки. Результат запоминается на время работы процесса и в файле
+кэша на диске (ключ - значение PATH), так что повторный поиск ничего не стоит.
+Запись кэша действительна, пока у файла git те же время изменения и размер
+(обновление git на месте сбрасывает запомненную версию).
+"""
+import functools
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+
+# Переменная окружения с явным путём к git
+GIT_ENV_VAR = "GIT_EXE"
+
+if os.name == "nt":
+    KNOWN_LOCATIONS = [
+        r"C:\Program Files\Git\bin\git.exe",
+        r"C:\Program Files (x86)\Git\bin\git.exe",
+        r"C:\Program Files\Git\cmd\git.exe",
+        os.path.join(os.environ.get("LOCALAPPDATA", ""), "Programs", "Git", "cmd", "git.exe"),
+    ]
+else:
+    KNOWN_LOCATIONS = [
+        "/usr/bin/git",
+        "/usr/local/bin/git",
+        "/opt/homebrew/bin/git",
+    ]
+
+
+def cache_path():
+    """Файл кэша результата поиска"""
+    if os.name == "nt":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "git_learning", "git_resolver.json")
+
+
+def _cache_key():
+    """Ключ кэша: PATH и явный путь из окружения"""
+    raw = os.environ.get("PATH", "") + os.pathsep + os.environ.get(GIT_ENV_VAR, "")
+    return hashlib.sha1(raw.encode("utf-8", errors="replace")).hexdigest()
+
+
+def _load_cache():
+    try:
+        with open(cache_path(), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_cache(entry):
+    """Запись результата в кэш (ошибки записи не мешают работе)"""
+    path = cache_path()
+    cache = _load_cache()
+    cache[_cache_key()] = entry
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(cache, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
+def _signature(path):
+    """Время изменения и размер файла git (None, если файла нет)"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+def _search():
+    """Поиск git без кэша"""
+    override = os.environ.get(GIT_ENV_VAR)
+    if override and os.path.isfile(override):
+        return os.path.abspath(override)
+
+    found = shutil.which("git")
+    if found:
+        return os.path.abspath(found)
+
+    for path in KNOWN_LOCATIONS:
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+@functools.lru_cache(maxsize=None)
+def _resolve():
+    """Путь к git и его версия: {"path": ..., "version": ...}"""
+    entry = _load_cache().get(_cache_key())
+    if entry and entry.get("path") and entry.get("signature") == _signature(entry["path"]):
+        return entry
+
+    path = _search()
+    entry = {"path": path, "version": None, "signature": _signature(path) if path else None}
+    if path:
+        try:
+            result = subprocess.run([path, "--version"], capture_output=True, text=True)
+            entry["version"] = result.stdout.strip() or None
+        except OSError:
+            entry["version"] = None
+        _save_cache(entry)
+    return entry
+
+
+def find_git():
+    """Полный путь к git или None"""
+    return _resolve()["path"]
+
+
+def git_version():
+    """Строка версии git (как у git --version) или None"""
+    return _resolve()["version"]
+
+
+def clear_cache():
+    """Сброс кэша (например, после установки другой версии git)"""
+    _resolve.cache_clear()
+    try:
+        os.remove(cache_path())
+    except OSError:
+        pass
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Список файлов проекта
+Обход через os.scandir: тип записи берётся из DirEntry без отдельного
+stat, размер - из entry.stat() (один вызов на файл, на Windows без
+обращения к диску). Обход потоковый: генератор со стеком папок, список
+всех файлов в памяти не собирается. Папки .git пропускаются, правила
+.gitignore (включая вложенные) учитываются так же, как в git_reader.
+"""
+import os
+from collections import namedtuple
+
+from git_reader import IgnoreRules
+
+# path - путь от корня проекта через "/"; size - None, если размер не нужен
+FileInfo = namedtuple("FileInfo", "path size")
+# top - {папка или файл верхнего уровня: [файлов, байт]}
+Summary = namedtuple("Summary", "files size top")
+
+
+def scan(root=".", recursive=True, gitignore=True, sizes=True):
+    """Файлы проекта: генератор FileInfo (порядок - как у файловой системы)"""
+    root = os.path.abspath(root)
+    rules = None
+    if gitignore:
+        rules = IgnoreRules()
+        rules.add_file(os.path.join(root, ".git", "info", "exclude"))
+    stack = [""]
+    while stack:
+        rel = stack.pop()
+        directory = os.path.join(root, *rel.split("/")) if rel else root
+        try:
+            with os.scandir(directory) as it:
+                entries = list(it)
+        except (FileNotFoundError, NotADirectoryError, PermissionError):
+            continue
+        if rules is not None and any(entry.name == ".gitignore" for entry in entries):
+            rules.add_file(os.path.join(directory, ".gitignore"), rel)
+        for entry in entries:
+            if entry.name == ".git":
+                continue
+            path = f"{rel}/{entry.name}" if rel else entry.name
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+            except OSError:
+                continue
+            if rules is not None and rules.rules and rules.is_ignored(path, is_dir):
+                continue
+            if is_dir:
+                if recursive:
+                    stack.append(path)
+                continue
+            size = None
+            if sizes:
+                try:
+                    size = entry.stat(follow_symlinks=False).st_size
+                except OSError:
+                    continue  # файл удалён во время обхода
+            yield FileInfo(path, size)
+
+
+def count_files(root=".", **options):
+    """Количество файлов (без stat для размеров)"""
+    return sum(1 for _ in scan(root, sizes=False, **options))
+
+
+def summarize(root=".", **options):
+    """Количество файлов и общий размер, а также по каждой записи верхнего уровня"""
+    files = 0
+    size = 0
+    top = {}
+    for info in scan(root, sizes=True, **options):
+        files += 1
+        size += info.size
+        totals = top.setdefault(info.path.split("/", 1)[0], [0, 0])
+        totals[0] += 1
+        totals[1] += info.size
+    return Summary(files, size, top)
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Отложенный импорт модулей
+lazy_import("имя") возвращает заместитель модуля: сам модуль загружается
+при первом обращении к его атрибуту. Так скрипты при запуске (и при
+--help) не тратят время на модули, которые выбранной команде не нужны.
+"""
+import sys
+import threading
+
+_lock = threading.Lock()
+
+
+class LazyModule:
+    """Заместитель модуля, который импортирует его при первом обращении"""
+
+    def __init__(self, name):
+        self.__dict__["_name"] = name
+        self.__dict__["_module"] = None
+
+    def _load(self):
+        module = self.__dict__["_module"]
+        if module is None:
+            with _lock:
+                name = self.__dict__["_name"]
+                __import__(name)
+                module = self.__dict__["_module"] = sys.modules[name]
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def __repr__(self):
+        state = "загружен" if self.__dict__["_module"] is not None else "не загружен"
+        return f"<lazy module {self.__dict__['_name']!r} ({state})>"
+
+
+def lazy_import(name):
+    """Модуль, если он уже загружен, иначе его заместитель"""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    return LazyModule(name)
@@ -1,4 +1,7 @@
 #!/usr/bin/env python3
+import array
+import operator
+
 print("Привет, Git!")
 print("Это мой первый проект под контролем версий")
 
@@ -10,5 +13,39 @@ def calculator(a, b):
     if b != 0:
         print(f"{a} / {b} = {a / b}")
 
+def calculate_batch(a, b):
+    """
+    Калькулятор для массивов пар чисел (без вывода)
+    a, b - списки, array.array или массивы NumPy одной длины.
+    Возвращает {"add", "sub", "mul", "div"}; деление на ноль даёт nan.
+    Векторно считается только с NumPy; без него - запасной путь через
+    array.array, где каждая пара обрабатывается в цикле Python.
+    """
+    # Проверка до NumPy: иначе массивы разной формы тихо расширились бы друг под друга
+    if len(a) != len(b):
+        raise ValueError(f"Разная длина массивов: {len(a)} и {len(b)}")
+    try:
+        import numpy
+    except ImportError:
+        numpy = None  # запасной путь: array.array, поэлементно
+    
+    if numpy is not None:
+        a = numpy.asarray(a, dtype=float)
+        b = numpy.asarray(b, dtype=float)
+        div = numpy.full(a.shape, numpy.nan)
+        numpy.divide(a, b, out=div, where=b != 0)
+        return {"add": a + b, "sub": a - b, "mul": a * b, "div": div}
+    
+    a = array.array("d", a)
+    b = array.array("d", b)
+    # Та же маска, что where=b != 0 у NumPy: при делителе 0 - nan
+    nan = float("nan")
+    return {
+        "add": array.array("d", map(operator.add, a, b)),
+        "sub": array.array("d", map(operator.sub, a, b)),
+        "mul": array.array("d", map(operator.mul, a, b)),
+        "div": array.array("d", [x / y if y != 0 else nan for x, y in zip(a, b)]),
+    }
+
 if __name__ == "__main__":
     calculator(10, 2)
@@ -2,6 +2,8 @@
 """
 Вспомогательные функции
 """
+import array
+import operator
 
 def show_system_info():
     """Показать информацию о системе"""
@@ -24,6 +26,49 @@ def calculate(a, b):
     else:
         print("  Деление на ноль!")
 
+def calculate_batch(a, b):
+    """
+    Калькулятор для массивов пар чисел (без вывода)
+    a, b - списки, array.array или массивы NumPy одной длины.
+    Возвращает {"add", "sub", "mul", "div"}; деление на ноль даёт nan.
+    Векторно считается только с NumPy; без него - запасной путь через
+    array.array, где каждая пара обрабатывается в цикле Python.
+    """
+    # Проверка до NumPy: иначе массивы разной формы тихо расширились бы друг под друга
+    if len(a) != len(b):
+        raise ValueError(f"Разная длина массивов: {len(a)} и {len(b)}")
+    try:
+        import numpy
+    except ImportError:
+        numpy = None  # запасной путь: array.array, поэлементно
+    
+    if numpy is not None:
+        a = numpy.asarray(a, dtype=float)
+        b = numpy.asarray(b, dtype=float)
+        div = numpy.full(a.shape, numpy.nan)
+        numpy.divide(a, b, out=div, where=b != 0)
+        return {"add": a + b, "sub": a - b, "mul": a * b, "div": div}
+    
+    a = array.array("d", a)
+    b = array.array("d", b)
+    # Та же маска, что where=b != 0 у NumPy: при делителе 0 - nan
+    nan = float("nan")
+    return {
+        "add": array.array("d", map(operator.add, a, b)),
+        "sub": array.array("d", map(operator.sub, a, b)),
+        "mul": array.array("d", map(operator.mul, a, b)),
+        "div": array.array("d", [x / y if y != 0 else nan for x, y in zip(a, b)]),
+    }
+
+def print_batch(a, b, results, limit=10):
+    """Показать первые limit строк результата calculate_batch"""
+    print(f"\n🧮 КАЛЬКУЛЯТОР: {len(results['add'])} пар чисел")
+    for i in range(min(limit, len(results["add"]))):
+        div = results["div"][i]
+        div_text = f"{div:.2f}" if div == div else "деление на ноль"
+        print(f"  {a[i]}, {b[i]}: {results['add'][i]} | {results['sub'][i]} | "
+              f"{results['mul'][i]} | {div_text}")
+
 if __name__ == "__main__":
     show_system_info()
     calculate(10, 2)
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Потоковый вывод команд
+Строки печатаются по мере появления, в памяти хранится не больше
+ограниченного буфера, а всё сверх лимита только подсчитывается.
+"""
+import codecs
+import contextlib
+import io
+import queue
+import subprocess
+import sys
+import threading
+
+# Сколько вывода одной команды показывать на экране
+MAX_OUTPUT_BYTES = 64 * 1024
+# Сколько строк может ждать в очереди между потоком чтения и выводом
+QUEUE_SIZE = 256
+# Максимальная длина одной прочитанной строки (длинные строки режутся на части)
+LINE_CHUNK = 8192
+# Кодировки вывода команд в порядке проверки (cp866 - консоль русской Windows)
+ENCODINGS = ('utf-8', 'cp866', 'cp1251', 'iso-8859-1')
+# Сколько байт вывода смотреть, чтобы определить кодировку
+SAMPLE_SIZE = 4096
+
+# Запасная кодировка, если вывод не UTF-8: {(тип команды, платформа): кодировка}
+_encoding_cache = {}
+
+
+class LineLimiter:
+    """Печать строк сразу по мере поступления, но не больше limit символов"""
+
+    def __init__(self, header, limit=MAX_OUTPUT_BYTES, suffix=""):
+        self.header = header
+        self.limit = limit
+        self.suffix = suffix
+        self.shown = 0
+        self.skipped = 0
+        self.skipped_bytes = 0  # пропущено без декодирования
+
+    def feed(self, text):
+        """Очередная порция вывода"""
+        if not text:
+            return
+        if self.shown == 0 and self.skipped == 0 and self.skipped_bytes == 0:
+            print(self.header)
+        room = self.limit - self.shown
+        if room > 0:
+            part = text[:room]
+            sys.stdout.write(part)
+            sys.stdout.flush()
+            self.shown += len(part)
+            self.skipped += len(text) - len(part)
+        else:
+            self.skipped += len(text)
+
+    @property
+    def full(self):
+        """Лимит исчерпан - дальнейший вывод можно не декодировать"""
+        return self.shown >= self.limit
+
+    def skip(self, size):
+        """Учесть пропущенный вывод, не печатая и не декодируя его (size - в байтах)"""
+        self.skipped_bytes += size
+
+    def close(self):
+        """Завершение вывода: сообщение об обрезке"""
+        if self.shown == 0:
+            return
+        skipped = []
+        if self.skipped:
+            skipped.append(f"{self.skipped} символов")
+        if self.skipped_bytes:
+            skipped.append(f"{self.skipped_bytes} байт")
+        if skipped:
+            print(f"\n   ... вывод обрезан, пропущено {' и '.join(skipped)}")
+        print(self.suffix)
+
+
+class ThreadLocalStdout:
+    """sys.stdout, который у каждого потока пишет в свой файл"""
+
+    def __init__(self, default):
+        self.default = default
+        self.local = threading.local()
+
+    @property
+    def stream(self):
+        return getattr(self.local, "stream", self.default)
+
+    def write(self, text):
+        return self.stream.write(text)
+
+    def flush(self):
+        self.stream.flush()
+
+    def __getattr__(self, name):
+        # encoding, isatty и прочее - от текущего потока вывода
+        return getattr(self.stream, name)
+
+    @contextlib.contextmanager
+    def redirect(self, stream):
+        """Перенаправить вывод текущего потока"""
+        self.local.stream = stream
+        try:
+            yield stream
+        finally:
+            del self.local.stream
+
+
+class BoundedBuffer:
+    """Накопление вывода не больше limit символов"""
+
+    def __init__(self, limit=MAX_OUTPUT_BYTES):
+        self.limit = limit
+        self.parts = []
+        self.size = 0
+        self.skipped = 0
+
+    def feed(self, text):
+        room = self.limit - self.size
+        if room > 0:
+            part = text[:room]
+            self.parts.append(part)
+            self.size += len(part)
+            self.skipped += len(text) - len(part)
+        else:
+            self.skipped += len(text)
+
+    @property
+    def text(self):
+        return "".join(self.parts)
+
+
+def detect_encoding(sample, encodings=ENCODINGS):
+    """Первая кодировка, в которой образец декодируется без ошибок"""
+    for encoding in encodings:
+        decoder = codecs.getincrementaldecoder(encoding)()
+        try:
+            # final=False: обрезанный в конце образца символ не считается ошибкой
+            decoder.decode(sample, final=False)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+    return encodings[-1]
+
+
+class OutputDecoder:
+    """
+    Однопроходное декодирование вывода по частям
+    Пока вывод состоит из ASCII, он одинаков во всех кодировках. Кодировка
+    выбирается по первой части с не-ASCII байтами, дальше байты декодируются
+    инкрементально. UTF-8 проверяется всегда первой; для этого типа команды
+    запоминается только запасная кодировка и проверяется следующей.
+    """
+
+    def __init__(self, key, encodings=ENCODINGS):
+        self.key = key
+        self.encodings = encodings
+        self.encoding = None
+        self._decoder = None
+
+    def decode(self, data):
+        """Декодирование очередной части вывода"""
+        if self._decoder is None:
+            if data.isascii():
+                return data.decode("ascii")
+            fallback = _encoding_cache.get(self.key)
+            encodings = self.encodings
+            if fallback:
+                encodings = tuple(dict.fromkeys((*encodings[:1], fallback, *encodings[1:])))
+            self.encoding = detect_encoding(data[:SAMPLE_SIZE], encodings)
+            if self.encoding != encodings[0]:
+                _encoding_cache[self.key] = self.encoding
+            self._decoder = codecs.getincrementaldecoder(self.encoding)(errors="replace")
+        return self._decoder.decode(data)
+
+    def flush(self):
+        """Остаток незавершённого символа в конце вывода"""
+        if self._decoder is None:
+            return ""
+        return self._decoder.decode(b"", final=True)
+
+
+def command_kind(command):
+    """Тип команды для кэша кодировок: программа (и подкоманда для git)"""
+    parts = command.split()
+    if not parts:
+        return ""
+    if parts[0] == "git" and len(parts) > 1:
+        return f"git {parts[1]}"
+    return parts[0]
+
+
+def _pump(stream, kind, lines):
+    """Фоновое чтение потока построчно в общую ограниченную очередь"""
+    end = "" if isinstance(stream, io.TextIOBase) else b""
+    for line in iter(lambda: stream.readline(LINE_CHUNK), end):
+        lines.put((kind, line))
+    lines.put((kind, None))
+
+
+def stream_command(command, on_stdout, on_stderr, cwd=None, encoding="utf-8"):
+    """
+    Запуск команды с построчной передачей вывода в обработчики
+    encoding=None - строки передаются как bytes
+    Возвращает код завершения.
+    """
+    process = subprocess.Popen(
+        command,
+        shell=True,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        cwd=cwd,
+        text=encoding is not None,
+        encoding=encoding,
+        errors="replace" if encoding else None,
+    )
+    lines = queue.Queue(maxsize=QUEUE_SIZE)
+    handlers = {"stdout": on_stdout, "stderr": on_stderr}
+    for kind, stream in (("stdout", process.stdout), ("stderr", process.stderr)):
+        threading.Thread(target=_pump, args=(stream, kind, lines), daemon=True).start()
+
+    open_streams = 2
+    while open_streams:
+        kind, line = lines.get()
+        if line is None:
+            open_streams -= 1
+        else:
+            handlers[kind](line)
+    return process.wait()
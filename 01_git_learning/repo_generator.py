@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Генератор больших учебных репозиториев
+Сначала обычный проход туториала (GitLearning без вопросов) создаёт проект
+из тех же шаблонов файлов, затем поверх него планами коммитов записывается
+длинная история: заданное число коммитов, веток и размер файлов. Каждый
+план пишет свои объекты одним pack-файлом, а не тысячами отдельных файлов.
+Нужен для замеров status и итогов на репозиториях не игрушечного размера.
+"""
+import argparse
+import contextlib
+import os
+import random
+import subprocess
+import sys
+import time
+
+import templates
+from batch_runner import build_repository, prepare_worker
+from commit_plan import CommitPlan
+from git_reader import GitRepoReader
+from git_resolver import find_git
+from start_git import GitLearning
+
+# Сколько коммитов записывать одним планом (ограничивает память)
+PLAN_SIZE = 1000
+# Шаблоны туториала, из которых собирается содержимое модулей
+TEMPLATE_NAMES = ("start_git/main.py", "start_git/advanced_calculator.py")
+# Коммитов в каждой сгенерированной ветке
+BRANCH_COMMITS = 3
+
+
+class ModuleTemplates:
+    """Содержимое модулей из шаблонов туториала нужного размера"""
+
+    def __init__(self, file_size):
+        self.template = "\n".join(templates.render(name) for name in TEMPLATE_NAMES)
+        self.file_size = file_size
+        self._bodies = {}
+
+    def body(self, module):
+        """Текст модуля без заголовка (одинаков для всех ревизий)"""
+        if module not in self._bodies:
+            text = self.template.replace("def ", f"def m{module}_")
+            repeat = self.file_size // max(len(text), 1) + 1
+            self._bodies[module] = (text * repeat)[:self.file_size]
+        return self._bodies[module]
+
+    def render(self, module, revision):
+        """Модуль в заданной ревизии: меняется только первая строка"""
+        return f'"""Модуль {module}, ревизия {revision}"""\n' + self.body(module)
+
+
+def module_path(module):
+    return f"src/module_{module:04d}.py"
+
+
+def plan_history(rng, commits, files):
+    """История основной ветки: [(номер коммита, {модуль: ревизия})]"""
+    revisions = [0] * files
+    history = []
+    for number in range(commits):
+        changes = {}
+        for module in rng.sample(range(files), min(files, rng.randint(1, 3))):
+            revisions[module] += 1
+            changes[module] = revisions[module]
+        history.append((number, changes))
+    return history, revisions
+
+
+def history_clock(workdir, commits):
+    """
+    Время коммитов истории: функция номер коммита -> секунды Unix и момент генерации
+    Коммиты равномерно распределяются между последним коммитом туториала и
+    текущим моментом: история не старше своего родителя и не в будущем
+    (при нехватке секунд у соседних коммитов одинаковое время, как у git).
+    """
+    reader = GitRepoReader(workdir)
+    try:
+        _, tip = reader.head()
+        tip_time = reader.commit(tip).time if tip else 0
+    finally:
+        reader.close()
+    now = max(int(time.time()), tip_time)
+    first = min(tip_time + 1, now)
+    return (lambda number: first + (now - first) * number // max(commits - 1, 1)), now
+
+
+def apply_history(workdir, module_templates, history, clock):
+    """
+    Запись истории основной ветки частями по PLAN_SIZE коммитов
+    clock(number) - время коммита (см. history_clock).
+    """
+    created = []
+    for offset in range(0, len(history), PLAN_SIZE):
+        plan = CommitPlan(workdir, packed=True)
+        for number, changes in history[offset:offset + PLAN_SIZE]:
+            files = {module_path(m): module_templates.render(m, r) for m, r in changes.items()}
+            modules = ", ".join(str(m) for m in changes)
+            plan.add_commit(files, f"Генерация: коммит {number + 1} (модули {modules})", clock(number))
+        created += plan.apply()
+        print(f"   ... записано коммитов: {len(created)}")
+    return created
+
+
+def apply_branches(workdir, module_templates, rng, main_commits, branches, files, clock, now):
+    """
+    Ветки, отходящие от случайных коммитов основной ветки
+    Коммиты ветки датируются между коммитом, от которого она отходит, и now.
+    """
+    for index in range(branches):
+        position = rng.randrange(len(main_commits))
+        start = main_commits[position]
+        start_time = clock(position)
+        plan = CommitPlan(workdir, branch=f"generated/branch_{index:03d}",
+                          start_point=start, packed=True)
+        for number in range(BRANCH_COMMITS):
+            module = rng.randrange(files)
+            revision = f"{index}.{number + 1}"
+            plan.add_commit({module_path(module): module_templates.render(module, revision)},
+                            f"Ветка {index}: изменён модуль {module}",
+                            start_time + (now - start_time) * (number + 1) // BRANCH_COMMITS)
+        plan.apply(sync_index=False)
+
+
+@contextlib.contextmanager
+def worker_state():
+    """
+    prepare_worker на время генерации
+    Переменные GIT_CONFIG_* и sys.stdout вызывающего процесса потом восстанавливаются.
+    """
+    keys = ("GIT_CONFIG_COUNT", "GIT_CONFIG_KEY_0", "GIT_CONFIG_VALUE_0")
+    saved_env = {key: os.environ.get(key) for key in keys}
+    saved_stdout = sys.stdout
+    prepare_worker()
+    try:
+        yield
+    finally:
+        sys.stdout = saved_stdout
+        for key, value in saved_env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+
+def generate(base_dir, project_name="large_repo", commits=10000, branches=20, files=200,
+             file_size=4096, seed=1, repack=False):
+    """Создание большого репозитория; возвращает сводку"""
+    with worker_state():
+        return _generate(base_dir, project_name, commits, branches, files, file_size, seed, repack)
+
+
+def _generate(base_dir, project_name, commits, branches, files, file_size, seed, repack):
+    os.makedirs(base_dir, exist_ok=True)
+    base_dir = os.path.abspath(base_dir)
+    rng = random.Random(seed)
+    timings = {}
+
+    started = time.perf_counter()
+    print(f"📚 Туториал: {project_name}")
+    build_repository(base_dir, project_name)
+    timings["tutorial"] = time.perf_counter() - started
+
+    learning = GitLearning(project_name=project_name, base_dir=base_dir, interactive=False)
+    learning.workdir = os.path.join(base_dir, project_name)
+    module_templates = ModuleTemplates(file_size)
+    history, revisions = plan_history(rng, commits, files)
+
+    # Рабочая папка сразу получает итоговые версии модулей, чтобы индекс
+    # после каждого плана совпадал с файлами и git status был чистым
+    started = time.perf_counter()
+    os.makedirs(learning.path("src"), exist_ok=True)
+    with open(os.devnull, "w", encoding="utf-8") as devnull, sys.stdout.redirect(devnull):
+        for module, revision in enumerate(revisions):
+            if revision:
+                learning.create_file(module_path(module), module_templates.render(module, revision))
+    timings["worktree"] = time.perf_counter() - started
+
+    print(f"📝 Коммитов в основной ветке: {commits}")
+    started = time.perf_counter()
+    clock, now = history_clock(learning.workdir, commits)
+    main_commits = apply_history(learning.workdir, module_templates, history, clock)
+    timings["commits"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    if main_commits and branches:
+        print(f"🌿 Веток: {branches}")
+        apply_branches(learning.workdir, module_templates, rng, main_commits, branches, files, clock, now)
+    timings["branches"] = time.perf_counter() - started
+
+    if repack:
+        # Сжатие дельтами и упаковка ссылок, как в долгоживущем репозитории
+        started = time.perf_counter()
+        git = find_git() or "git"
+        subprocess.run([git, "repack", "-a", "-d", "-q"], cwd=learning.workdir, check=True)
+        subprocess.run([git, "pack-refs", "--all"], cwd=learning.workdir, check=True)
+        timings["repack"] = time.perf_counter() - started
+
+    return {
+        "path": learning.workdir,
+        "commits": len(main_commits),
+        "branches": branches,
+        "files": sum(1 for revision in revisions if revision),
+        "file_size": file_size,
+        "timings": timings,
+    }
+
+
+def main():
+    """Точка входа"""
+    parser = argparse.ArgumentParser(description="Генерация большого учебного Git репозитория")
+    parser.add_argument("--dir", default="generated", help="папка для репозитория")
+    parser.add_argument("--name", default="large_repo", help="имя проекта")
+    parser.add_argument("--commits", type=int, default=10000, help="коммитов в основной ветке")
+    parser.add_argument("--branches", type=int, default=20, help="дополнительных веток")
+    parser.add_argument("--files", type=int, default=200, help="количество модулей в src/")
+    parser.add_argument("--file-size", type=int, default=4096, help="размер модуля в байтах")
+    parser.add_argument("--seed", type=int, default=1, help="зерно генератора случайных чисел")
+    parser.add_argument("--repack", action="store_true",
+                        help="после генерации выполнить git repack и git pack-refs")
+    args = parser.parse_args()
+
+    summary = generate(args.dir, args.name, args.commits, args.branches, args.files,
+                       args.file_size, args.seed, args.repack)
+
+    print("\n" + "="*60)
+    print("📊 СГЕНЕРИРОВАННЫЙ РЕПОЗИТОРИЙ")
+    print("="*60)
+    print(f"  Путь: {summary['path']}")
+    print(f"  Коммитов (сгенерировано): {summary['commits']}")
+    print(f"  Веток (сгенерировано): {summary['branches']}")
+    print(f"  Модулей: {summary['files']} по {summary['file_size']} байт")
+    for name, seconds in summary["timings"].items():
+        print(f"  {name:<12} {seconds:8.2f} с")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Запуск сгенерированных скриптов проекта
+По умолчанию скрипт выполняется внутри текущего процесса через runpy:
+без запуска нового интерпретатора, в отдельном пространстве имён и с
+перехваченным выводом. Для скриптов, которым нужна своя рабочая папка или
+отдельный процесс, есть запуск через subprocess (в том числе пулом).
+"""
+import io
+import os
+import runpy
+import subprocess
+import sys
+import threading
+import traceback
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from output_stream import ThreadLocalStdout
+
+# Сколько секунд ждать скрипт по умолчанию
+SCRIPT_TIMEOUT = 30
+
+ScriptResult = namedtuple("ScriptResult", "path returncode stdout stderr in_process timed_out")
+
+# Скрипты внутри процесса выполняются по одному: sys.argv и sys.path общие.
+# Блокировку отпускает сам поток скрипта, когда закончит (даже после timeout)
+_in_process_lock = threading.Lock()
+# Потоки скриптов, не уложившихся в timeout
+_hung_workers = []
+
+
+def _exit_code(code, stderr):
+    """Код завершения из SystemExit.code"""
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code
+    stderr.write(f"{code}\n")
+    return 1
+
+
+def _execute(path, args, stdout, stderr, result):
+    """Выполнение скрипта в текущем потоке (вызывается в отдельном потоке)"""
+    script_dir = os.path.dirname(path)
+    modules_before = set(sys.modules)
+    saved_argv = sys.argv
+    sys.argv = [path, *args]
+    sys.path.insert(0, script_dir)
+    try:
+        with sys.stdout.redirect(stdout), sys.stderr.redirect(stderr):
+            try:
+                runpy.run_path(path, run_name="__main__")
+                result["returncode"] = 0
+            except SystemExit as e:
+                result["returncode"] = _exit_code(e.code, stderr)
+            except BaseException:
+                traceback.print_exc(file=stderr)
+                result["returncode"] = 1
+    finally:
+        sys.argv = saved_argv
+        try:
+            sys.path.remove(script_dir)
+        except ValueError:
+            pass
+        # Модули проекта (например, utils) не должны остаться в sys.modules
+        for name in set(sys.modules) - modules_before:
+            module_file = getattr(sys.modules[name], "__file__", None) or ""
+            if os.path.dirname(os.path.abspath(module_file)) == script_dir:
+                del sys.modules[name]
+
+
+def _execute_locked(path, args, stdout, stderr, result):
+    """_execute, после которого отпускается _in_process_lock"""
+    try:
+        _execute(path, args, stdout, stderr, result)
+    finally:
+        _in_process_lock.release()
+
+
+def _hung():
+    """Работает ли ещё скрипт, не уложившийся в timeout"""
+    _hung_workers[:] = [worker for worker in _hung_workers if worker.is_alive()]
+    return bool(_hung_workers)
+
+
+def _run_in_process(path, timeout, args, capture):
+    """
+    Скрипт в текущем интерпретаторе
+    Зависший скрипт нельзя остановить внутри процесса: по истечении
+    timeout его поток остаётся работать в фоне (и держит блокировку, пока
+    не вернёт sys.argv и sys.path), а результат помечается timed_out.
+    Пока такой поток жив, следующие скрипты запускаются отдельным процессом.
+    """
+    # Вывод перенаправляется только для потока скрипта
+    for name in ("stdout", "stderr"):
+        if not isinstance(getattr(sys, name), ThreadLocalStdout):
+            setattr(sys, name, ThreadLocalStdout(getattr(sys, name)))
+    stdout = io.StringIO() if capture else sys.stdout.default
+    stderr = io.StringIO() if capture else sys.stderr.default
+    result = {"returncode": None}
+
+    while not _in_process_lock.acquire(timeout=0.1):
+        if _hung():
+            return _run_subprocess(path, timeout, args, capture)
+    worker = threading.Thread(target=_execute_locked, args=(path, args, stdout, stderr, result), daemon=True)
+    try:
+        worker.start()
+    except BaseException:
+        _in_process_lock.release()
+        raise
+    worker.join(timeout)
+    timed_out = worker.is_alive()
+    if timed_out:
+        _hung_workers.append(worker)
+    return ScriptResult(
+        path, result["returncode"],
+        stdout.getvalue() if capture else "",
+        stderr.getvalue() if capture else "",
+        True, timed_out,
+    )
+
+
+def _run_subprocess(path, timeout, args, capture):
+    """Скрипт в отдельном интерпретаторе, рабочая папка - папка скрипта"""
+    try:
+        completed = subprocess.run(
+            [sys.executable, path, *args],
+            cwd=os.path.dirname(path),
+            capture_output=capture,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+            timeout=timeout,
+        )
+    except subprocess.TimeoutExpired as e:
+        stdout = e.stdout.decode("utf-8", errors="replace") if isinstance(e.stdout, bytes) else e.stdout or ""
+        stderr = e.stderr.decode("utf-8", errors="replace") if isinstance(e.stderr, bytes) else e.stderr or ""
+        return ScriptResult(path, None, stdout, stderr, False, True)
+    return ScriptResult(path, completed.returncode, completed.stdout or "", completed.stderr or "", False, False)
+
+
+def run_script(path, timeout=SCRIPT_TIMEOUT, args=(), capture=True, in_process=True):
+    """
+    Запуск одного скрипта; возвращает ScriptResult
+    in_process=False - отдельный интерпретатор с рабочей папкой скрипта
+    (нужен скриптам, которые открывают файлы по относительным путям).
+    capture=False - вывод идёт сразу на экран.
+    """
+    path = os.path.abspath(path)
+    if in_process:
+        return _run_in_process(path, timeout, list(args), capture)
+    return _run_subprocess(path, timeout, list(args), capture)
+
+
+def run_scripts(paths, timeout=SCRIPT_TIMEOUT, in_process=True, workers=None):
+    """Несколько скриптов: по очереди внутри процесса или пулом процессов"""
+    if in_process:
+        return [run_script(path, timeout) for path in paths]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(lambda path: run_script(path, timeout, in_process=False), paths))
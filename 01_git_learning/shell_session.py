@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Долгоживущая сессия оболочки для обучающих скриптов Git
+Одна оболочка (cmd.exe на Windows, sh на остальных системах) запускается
+один раз, а команды передаются в неё по очереди через stdin.
+"""
+import os
+import queue
+import shlex
+import subprocess
+import threading
+import uuid
+
+from output_stream import LINE_CHUNK, QUEUE_SIZE
+
+
+class ShellSessionError(Exception):
+    """
+    Сессия оболочки завершилась или не отвечает
+    sent - команда уже была передана оболочке (повторять её нельзя:
+    она могла выполниться).
+    """
+
+    def __init__(self, message, sent=False):
+        super().__init__(message)
+        self.sent = sent
+
+
+class ShellSession:
+    """Одна оболочка на весь туториал вместо нового процесса на каждую команду"""
+
+    def __init__(self, encoding="utf-8"):
+        self.encoding = encoding
+        self.process = None
+        # Уникальный маркер конца вывода каждой команды
+        self._marker = f"__GIT_LEARNING_{uuid.uuid4().hex}__"
+        self._lines = queue.Queue(maxsize=QUEUE_SIZE)
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Запуск оболочки (если она ещё не запущена)"""
+        if self.process is not None and self.process.poll() is None:
+            return
+
+        if os.name == "nt":
+            args = ["cmd.exe", "/Q", "/K"]
+        else:
+            args = ["/bin/sh"]
+
+        try:
+            self.process = subprocess.Popen(
+                args,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                encoding=self.encoding,
+                errors="replace",
+                bufsize=1,
+            )
+        except OSError as e:
+            raise ShellSessionError(f"Не удалось запустить оболочку: {e}")
+        # Одна ограниченная очередь на оба потока: память не растёт,
+        # а stdout и stderr читаются одновременно (без взаимной блокировки)
+        self._lines = queue.Queue(maxsize=QUEUE_SIZE)
+        for kind, stream in (("stdout", self.process.stdout), ("stderr", self.process.stderr)):
+            reader = threading.Thread(target=self._read_lines, args=(stream, kind, self._lines), daemon=True)
+            reader.start()
+        if os.name == "nt":
+            # Команды передаются в UTF-8: cmd.exe должен читать их в той же кодировке
+            self._send("chcp 65001 > NUL\n")
+
+    def _send(self, text):
+        """Передать текст в stdin оболочки"""
+        try:
+            self.process.stdin.write(text)
+            self.process.stdin.flush()
+        except OSError as e:
+            self.kill()
+            raise ShellSessionError(f"Не удалось передать команду: {e}")
+
+    @staticmethod
+    def _read_lines(stream, kind, lines):
+        """Фоновое чтение потока построчно (None - конец потока)"""
+        for line in iter(lambda: stream.readline(LINE_CHUNK), ""):
+            lines.put((kind, line))
+        lines.put((kind, None))
+
+    def _frame(self, command, cwd):
+        """Команда вместе с переходом в папку и маркерами конца вывода"""
+        marker = self._marker
+        if os.name == "nt":
+            lines = []
+            if cwd:
+                lines.append(f'cd /d "{cwd}"')
+            lines.append(f"{command} < NUL")
+            lines.append(f"echo {marker} %errorlevel%")
+            lines.append(f"echo {marker} 1>&2")
+        else:
+            lines = []
+            if cwd:
+                lines.append(f"cd {shlex.quote(cwd)}")
+            # Команда не должна читать stdin сессии
+            lines.append("{\n" + command + "\n} < /dev/null")
+            lines.append(f'echo "{marker} $?"')
+            lines.append(f'echo "{marker}" 1>&2')
+        return "\n".join(lines) + "\n"
+
+    def stream(self, command, on_stdout, on_stderr, cwd=None, timeout=None):
+        """
+        Выполнить команду, передавая строки вывода в обработчики по мере появления
+        Возвращает код завершения.
+        """
+        handlers = {"stdout": on_stdout, "stderr": on_stderr}
+        with self._lock:
+            self.start()
+            self._send(self._frame(command, cwd))
+
+            try:
+                status = "0"
+                pending = {"stdout", "stderr"}
+                # Конец куска без перевода строки: маркер может начинаться в нём
+                # и продолжаться в следующем куске readline(LINE_CHUNK)
+                carry = {"stdout": "", "stderr": ""}
+                keep = len(self._marker) - 1
+                tails = {}
+                while pending:
+                    try:
+                        kind, line = self._lines.get(timeout=timeout)
+                    except queue.Empty:
+                        raise ShellSessionError("Оболочка не ответила вовремя", sent=True)
+                    if line is None:
+                        raise ShellSessionError("Оболочка неожиданно завершилась", sent=True)
+                    if kind in tails:
+                        # Продолжение строки с маркером: дочитать до перевода строки
+                        tails[kind] += line
+                    else:
+                        line = carry[kind] + line
+                        carry[kind] = ""
+                        position = line.find(self._marker)
+                        if position == -1:
+                            if not line.endswith("\n"):
+                                line, carry[kind] = line[:-keep], line[-keep:]
+                            if line:
+                                handlers[kind](line)
+                            continue
+                        # Вывод без перевода строки в конце оказывается перед маркером
+                        if position:
+                            handlers[kind](line[:position])
+                        tails[kind] = line[position + len(self._marker):]
+                    if not tails[kind].endswith("\n"):
+                        continue
+                    pending.discard(kind)
+                    if kind == "stdout":
+                        status = tails[kind].strip()
+            except BaseException:
+                # Вывод команды прочитан не до конца - сессию больше нельзя использовать
+                self.kill()
+                raise
+
+        try:
+            return int(status)
+        except ValueError:
+            return 0
+
+    def run(self, command, cwd=None, timeout=None):
+        """Выполнить команду в сессии, результат как у subprocess.run"""
+        stdout = []
+        stderr = []
+        returncode = self.stream(command, stdout.append, stderr.append, cwd, timeout)
+        return subprocess.CompletedProcess(command, returncode, "".join(stdout), "".join(stderr))
+
+    def kill(self):
+        """Немедленное завершение оболочки"""
+        if self.process is not None:
+            self.process.kill()
+            self.process = None
+
+    def close(self):
+        """Завершение оболочки"""
+        if self.process is None:
+            return
+        try:
+            self.process.stdin.write("exit\n")
+            self.process.stdin.flush()
+            self.process.stdin.close()
+            self.process.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            self.process.kill()
+        self.process = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
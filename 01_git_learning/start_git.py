@@ -4,19 +4,57 @@
 Автор: Вячеслав Ардеев
 """
 import os
-import subprocess
-import sys
-import time
-from datetime import datetime
+
+from lazy_imports import lazy_import
+
+# Модули загружаются при первом обращении: --help и отдельные шаги
+# не тратят время на то, что им не нужно
+datetime = lazy_import("datetime")
+shlex = lazy_import("shlex")
+subprocess = lazy_import("subprocess")
+async_probes = lazy_import("async_probes")
+checkpoint = lazy_import("checkpoint")
+commit_plan = lazy_import("commit_plan")
+file_writer = lazy_import("file_writer")
+git_reader = lazy_import("git_reader")
+inventory = lazy_import("inventory")
+output_stream = lazy_import("output_stream")
+script_runner = lazy_import("script_runner")
+shell_session = lazy_import("shell_session")
+templates = lazy_import("templates")
+tracing = lazy_import("tracing")
 
 class GitLearning:
     """Класс для интерактивного обучения Git (PowerShell версия)"""
     
-    def __init__(self):
-        self.project_name = "my_learning_project"
+    def __init__(self, project_name="my_learning_project", base_dir=None, interactive=True):
+        self.project_name = project_name
         self.steps_completed = 0
         self.total_steps = 10
-        
+        self.shell = None
+        # Папка, в которой создаётся проект, и текущая рабочая папка команд
+        self.base_dir = os.path.abspath(base_dir or os.getcwd())
+        self.workdir = self.base_dir
+        # В неинтерактивном режиме вопросы не задаются, используются ответы по умолчанию
+        self.interactive = interactive
+        self.step_timings = []
+        # Файлы из git add, которые в неинтерактивном режиме ждут git commit
+        self.staged_files = []
+        # Обработчики событий шагов и команд (см. tracing.py)
+        self.hooks = tracing.Hooks()
+        # Файл для статистики cProfile по шагам курса (None - без профилирования)
+        self.profile_path = None
+        
+    def path(self, filename):
+        """Путь к файлу в рабочей папке"""
+        return os.path.join(self.workdir, filename)
+    
+    def ask(self, prompt, default=""):
+        """Вопрос пользователю (в неинтерактивном режиме - ответ по умолчанию)"""
+        if not self.interactive:
+            return default
+        return input(prompt)
+    
     def print_header(self, title):
         """Печать заголовка"""
         print("\n" + "="*70)
@@ -34,35 +72,43 @@ class GitLearning:
         print(f"   Команда: {command}")
         
         if wait_for_user:
-            input("\n   Нажмите Enter для выполнения...")
+            self.ask("\n   Нажмите Enter для выполнения...")
+        
+        measure = tracing.Measure("command", command)
+        self.hooks.emit("before_command", measure.event)
+        exit_code = None
+        output_bytes = 0
+        
+        def counted(feed):
+            """Обработчик вывода, который считает байты"""
+            def wrapper(text):
+                nonlocal output_bytes
+                output_bytes += len(text.encode("utf-8", errors="replace"))
+                feed(text)
+            return wrapper
         
         try:
-            # Для Git команд используем cmd, для остальных - PowerShell
-            if command.startswith("git "):
-                # Git команды запускаем через cmd
-                result = subprocess.run(
-                    command, 
-                    shell=True, 
-                    text=True, 
-                    encoding='utf-8',
-                    capture_output=True,
-                    executable="cmd.exe"  # Явно указываем cmd для Git команд
-                )
-            else:
-                # Остальные команды через PowerShell
-                result = subprocess.run(
-                    command, 
-                    shell=True, 
-                    text=True, 
-                    encoding='utf-8',
-                    capture_output=True
-                )
+            # Вывод печатается по мере появления, ошибки копятся в ограниченном буфере
+            output = output_stream.LineLimiter("\n✅ Результат:")
+            errors = output_stream.BoundedBuffer()
             
-            if result.stdout:
-                print(f"\n✅ Результат:\n{result.stdout}")
+            # Без пользователя git add и git commit выполняются одним планом
+            # коммита; перед любой другой командой отложенный git add выполняется
+            result = None
+            if not self.interactive:
+                result = self.batch_staging(command)
+            # Команды только для чтения отвечаем напрямую из .git,
+            # остальные идут через одну долгоживущую оболочку
+            if result is None:
+                result = git_reader.answer(command, self.workdir)
+            if result is not None:
+                counted(output.feed)(result.stdout)
+                exit_code = result.returncode
+            else:
+                exit_code = self.run_in_shell(command, counted(output.feed), counted(errors.feed))
             
-            if result.stderr and "warning" not in result.stderr.lower():
-                print(f"\n⚠️  Предупреждения:\n{result.stderr}")
+            output.close()
+            self.show_errors(errors.text)
             
             self.steps_completed += 1
             return True
@@ -70,13 +116,110 @@ class GitLearning:
         except Exception as e:
             print(f"\n❌ Ошибка: {e}")
             return False
+        finally:
+            self.hooks.emit("after_command", measure.finish(exit_code, output_bytes))
+    
+    def batch_staging(self, command):
+        """
+        Пакетная обработка git add / git commit в неинтерактивном режиме
+        git add только запоминает файлы, git commit записывает их одним
+        планом коммита (без запуска git). Возвращает None, если команду
+        нужно выполнить обычным способом.
+        """
+        try:
+            args = shlex.split(command)
+        except ValueError:
+            args = []
+        
+        if (len(args) > 2 and args[:2] == ["git", "add"]
+                and all(os.path.isfile(self.path(arg)) for arg in args[2:])):
+            self.staged_files.extend(args[2:])
+            return subprocess.CompletedProcess(command, 0, "", "")
+        
+        if len(args) == 4 and args[:3] == ["git", "commit", "-m"] and self.staged_files:
+            files = list(dict.fromkeys(self.staged_files))
+            try:
+                plan = commit_plan.CommitPlan(self.workdir)
+                root_commit = plan.reader.head()[1] is None
+                sha = plan.add_commit(files, args[3]).apply()[0]
+            except commit_plan.CommitPlanError:
+                self.flush_staged()
+                return None
+            self.staged_files = []
+            branch = plan.ref[len("refs/heads/"):] if plan.ref.startswith("refs/heads/") else plan.ref
+            root = " (root-commit)" if root_commit else ""
+            return subprocess.CompletedProcess(
+                command, 0, f"[{branch}{root} {sha[:7]}] {args[3]}\n {len(files)} file(s) changed\n", "")
+        
+        # git status отвечается с учётом отложенного git add (план коммита не
+        # прерывается); любая другая команда видит файлы уже добавленными в индекс
+        if self.staged_files and args == ["git", "status"]:
+            result = git_reader.answer(command, self.workdir, pending=self.staged_files)
+            if result is not None:
+                return result
+        self.flush_staged()
+        return None
+    
+    def flush_staged(self):
+        """Обычный git add для файлов, ожидающих коммита"""
+        if self.staged_files:
+            files = " ".join(f'"{name}"' for name in dict.fromkeys(self.staged_files))
+            self.staged_files = []
+            self.run_in_shell(f"git add {files}", lambda line: None, lambda line: None)
+    
+    def show_result(self, result):
+        """Печать вывода выполненной команды"""
+        if result.stdout:
+            print(f"\n✅ Результат:\n{result.stdout}")
+        
+        self.show_errors(result.stderr)
+    
+    def show_errors(self, stderr):
+        """Печать предупреждений команды"""
+        if stderr and "warning" not in stderr.lower():
+            print(f"\n⚠️  Предупреждения:\n{stderr}")
+    
+    def run_in_shell(self, command, on_stdout, on_stderr):
+        """Выполнение команды в общей сессии оболочки с потоковым выводом"""
+        if os.name == "nt" and not command.isascii():
+            # Не-ASCII текст надёжнее передать в командной строке процесса, а не через stdin cmd.exe
+            return output_stream.stream_command(command, on_stdout, on_stderr, cwd=self.workdir)
+        if self.shell is None:
+            self.shell = shell_session.ShellSession()
+        try:
+            return self.shell.stream(command, on_stdout, on_stderr, cwd=self.workdir)
+        except shell_session.ShellSessionError as e:
+            self.close_shell()
+            if e.sent:
+                # Команда могла выполниться (например, git commit) - повторять её нельзя
+                raise
+            # Сессия недоступна - запускаем команду отдельным процессом
+            return output_stream.stream_command(command, on_stdout, on_stderr, cwd=self.workdir)
+    
+    def close_shell(self):
+        """Закрытие сессии оболочки"""
+        if self.shell is not None:
+            self.shell.close()
+            self.shell = None
     
     def create_file(self, filename, content):
         """Создание файла с содержимым"""
         print(f"\n📄 Создаю файл: {filename}")
-        with open(filename, 'w', encoding='utf-8') as f:
-            f.write(content)
-        print(f"✅ Файл {filename} создан")
+        # Файл с тем же содержимым не перезаписывается (git не увидит изменений)
+        if file_writer.write_text(self.path(filename), content):
+            print(f"✅ Файл {filename} создан")
+        else:
+            print(f"✅ Файл {filename} уже актуален")
+        return True
+    
+    def create_files(self, files, **values):
+        """Создание нескольких файлов по шаблонам: {имя файла: имя шаблона}"""
+        for filename, written in templates.scaffold(self.workdir, files, **values).items():
+            print(f"\n📄 Создаю файл: {filename}")
+            if written:
+                print(f"✅ Файл {filename} создан")
+            else:
+                print(f"✅ Файл {filename} уже актуален")
         return True
     
     def check_git_installation(self):
@@ -85,13 +228,39 @@ class GitLearning:
         
         print("🔍 Проверяю вашу настройку Git...")
         
-        # Проверяем версию Git
-        self.run_command("git --version", "Проверка версии Git", wait_for_user=False)
+        # Все три проверки независимы - запускаем их одновременно
+        checks = [
+            ("git --version", "Проверка версии Git"),
+            ("git config user.name", "Ваше имя в Git"),
+            ("git config user.email", "Ваш email в Git"),
+        ]
+        # Каждая проверка - команда для хуков (трассировка, профилирование)
+        measures = {}
+        
+        def on_start(probe):
+            measures[probe.name] = tracing.Measure("command", probe.name)
+            self.hooks.emit("before_command", measures[probe.name].event)
+        
+        def on_finish(probe, result):
+            exit_code = None
+            output_bytes = 0
+            if result is not None:
+                exit_code = result.returncode
+                output_bytes = len((result.stdout + result.stderr).encode("utf-8", errors="replace"))
+            self.hooks.emit("after_command", measures[probe.name].finish(exit_code, output_bytes))
+        
+        results = async_probes.run_probes(
+            [async_probes.Probe(command, command.split()) for command, _ in checks],
+            cwd=self.workdir, on_start=on_start, on_finish=on_finish,
+        )
         
-        # Проверяем настройки пользователя
-        print("\n👤 Проверяю настройки пользователя...")
-        self.run_command("git config user.name", "Ваше имя в Git", wait_for_user=False)
-        self.run_command("git config user.email", "Ваш email в Git", wait_for_user=False)
+        for command, description in checks:
+            if command == "git config user.name":
+                print("\n👤 Проверяю настройки пользователя...")
+            print(f"\n💻 {description}")
+            print(f"   Команда: {command}")
+            self.show_result(results[command])
+            self.steps_completed += 1
         
         print("\n✅ Git настроен корректно!")
         return True
@@ -101,23 +270,24 @@ class GitLearning:
         self.print_step(1, "СОЗДАНИЕ ПЕРВОГО GIT РЕПОЗИТОРИЯ")
         
         # Создаем папку проекта
-        if os.path.exists(self.project_name):
+        if os.path.exists(os.path.join(self.base_dir, self.project_name)):
             print(f"📁 Папка '{self.project_name}' уже существует.")
-            choice = input("   Использовать существующую? (y/n): ")
+            choice = self.ask("   Использовать существующую? (y/n): ", default="y")
             if choice.lower() != 'y':
-                self.project_name = input("   Введите новое имя проекта: ")
+                self.project_name = self.ask("   Введите новое имя проекта: ")
         
-        os.makedirs(self.project_name, exist_ok=True)
-        os.chdir(self.project_name)
+        # Вместо os.chdir все команды и файлы используют self.workdir
+        self.workdir = os.path.join(self.base_dir, self.project_name)
+        os.makedirs(self.workdir, exist_ok=True)
         
-        print(f"📁 Рабочая директория: {os.getcwd()}")
+        print(f"📁 Рабочая директория: {self.workdir}")
         
         # Инициализируем Git
         self.run_command("git init", "Инициализация Git репозитория")
         
         # Показываем скрытую папку .git
         print("\n📂 Создана скрытая папка .git/")
-        if os.path.exists(".git"):
+        if os.path.exists(self.path(".git")):
             print("   Содержимое папки .git/:")
             # Используем PowerShell команду для показа скрытых файлов
             self.run_command("dir -Force", "Показать все файлы (включая скрытые)", wait_for_user=False)
@@ -128,135 +298,11 @@ class GitLearning:
         """Шаг 2: Создание первых файлов"""
         self.print_step(2, "СОЗДАНИЕ ПЕРВЫХ ФАЙЛОВ ПРОЕКТА")
         
-        # Создаем README.md
-        readme_content = """# Мой первый Git проект
-
-Этот проект создан в процессе обучения Git.
-
-## Описание проекта:
-Проект предназначен для изучения системы контроля версий Git.
-
-## Цели обучения:
-1. Освоить основные команды Git
-2. Научиться работать с ветками
-3. Понять процесс слияния изменений
-4. Научиться отменять изменения
-
-## Технологии:
-- Python 3.9+
-- Git 2.52.0+
-- VS Code
-
-## Автор:
-Вячеслав Ардеев
-ardeev1999@gmail.com
-
----
-
-*Создано: {date}*
-""".format(date=datetime.now().strftime("%Y-%m-%d %H:%M"))
-        
-        self.create_file("README.md", readme_content)
-        
-        # Создаем первый Python скрипт
-        python_content = '''#!/usr/bin/env python3
-"""
-Главный файл проекта - приветствие
-"""
-
-import datetime
-
-def show_greeting():
-    """Показать приветствие"""
-    print("="*50)
-    print("ПРИВЕТСТВИЕ ОТ ПЕРВОГО GIT ПРОЕКТА!")
-    print("="*50)
-    
-    name = "Вячеслав Ардеев"
-    email = "ardeev1999@gmail.com"
-    
-    print(f"\\n👤 Автор: {name}")
-    print(f"📧 Email: {email}")
-    print(f"📅 Дата: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    print("\\n🎯 Цель проекта: Изучение Git на практике")
-    print("\\n" + "="*50)
-
-def show_menu():
-    """Показать меню"""
-    print("\\n📋 МЕНЮ ПРОЕКТА:")
-    print("1. Показать информацию о проекте")
-    print("2. Запустить калькулятор")
-    print("3. Проверить систему")
-    print("4. Выход")
-    
-    try:
-        choice = input("\\nВыберите опцию (1-4): ")
-        return int(choice)
-    except ValueError:
-        return 0
-
-def run_calculator():
-    """Запустить простой калькулятор"""
-    print("\\n🧮 КАЛЬКУЛЯТОР")
-    print("-"*30)
-    
-    try:
-        a = float(input("Введите первое число: "))
-        b = float(input("Введите второе число: "))
-        
-        print(f"\\nРезультаты:")
-        print(f"  {a} + {b} = {a + b}")
-        print(f"  {a} - {b} = {a - b}")
-        print(f"  {a} * {b} = {a * b}")
-        if b != 0:
-            print(f"  {a} / {b} = {a / b:.2f}")
-        else:
-            print("  Деление на ноль невозможно!")
-            
-    except ValueError:
-        print("Ошибка: введите числа корректно!")
-
-def check_system():
-    """Проверка системы"""
-    import platform
-    import sys
-    
-    print("\\n🖥️  ИНФОРМАЦИЯ О СИСТЕМЕ:")
-    print(f"  ОС: {platform.system()} {platform.release()}")
-    print(f"  Python: {platform.python_version()}")
-    print(f"  Процессор: {platform.processor()}")
-    print(f"  Архитектура: {platform.architecture()[0]}")
-
-if __name__ == "__main__":
-    show_greeting()
-    
-    while True:
-        choice = show_menu()
-        
-        if choice == 1:
-            print("\\n📊 ИНФОРМАЦИЯ О ПРОЕКТЕ:")
-            print("Название: Мой первый Git проект")
-            print("Автор: Вячеслав Ардеев")
-            print("Версия: 1.0.0")
-            print("Дата создания: 2024")
-            
-        elif choice == 2:
-            run_calculator()
-            
-        elif choice == 3:
-            check_system()
-            
-        elif choice == 4:
-            print("\\n👋 До свидания!")
-            break
-            
-        else:
-            print("\\n❌ Неверный выбор. Попробуйте снова.")
-        
-        input("\\nНажмите Enter для продолжения...")
-'''
-        
-        self.create_file("main.py", python_content)
+        # README.md и первый Python скрипт создаются одновременно из шаблонов
+        self.create_files(
+            {"README.md": "start_git/README.md", "main.py": "start_git/main.py"},
+            date=datetime.datetime.now().strftime("%Y-%m-%d %H:%M"),
+        )
         
         print("\n📁 Созданные файлы:")
         # Используем PowerShell команду вместо ls -la
@@ -295,14 +341,60 @@ if __name__ == "__main__":
         print("\n✏️  Добавляем новую функцию в main.py...")
         
         # Читаем текущий файл
-        with open("main.py", "r", encoding="utf-8") as f:
+        with open(self.path("main.py"), "r", encoding="utf-8") as f:
             content = f.read()
         
         # Добавляем новую функцию перед if __name__ == "__main__":
         new_function = '''
 def show_git_info():
     """Показать информацию о Git"""
+    import os
     import subprocess
+    import zlib
+    
+    def read_head():
+        """Текущая ветка и её коммит из .git (без запуска git)"""
+        with open(os.path.join(".git", "HEAD"), "r", encoding="utf-8") as f:
+            head = f.read().strip()
+        if not head.startswith("ref: "):
+            return f"отсоединённый HEAD ({head[:7]})", head
+        ref = head[len("ref: "):]
+        branch = ref[len("refs/heads/"):] if ref.startswith("refs/heads/") else ref
+        try:
+            with open(os.path.join(".git", *ref.split("/")), "r", encoding="utf-8") as f:
+                return branch, f.read().strip()
+        except FileNotFoundError:
+            pass
+        try:
+            with open(os.path.join(".git", "packed-refs"), "r", encoding="utf-8") as f:
+                for line in f:
+                    sha, _, name = line.strip().partition(" ")
+                    if name == ref:
+                        return branch, sha
+        except FileNotFoundError:
+            pass
+        return branch, None  # коммитов ещё нет
+    
+    def count_commits(sha):
+        """Количество коммитов по неупакованным объектам (None - объект в pack-файле)"""
+        seen = set()
+        stack = [sha]
+        while stack:
+            sha = stack.pop()
+            if sha in seen:
+                continue
+            seen.add(sha)
+            try:
+                with open(os.path.join(".git", "objects", sha[:2], sha[2:]), "rb") as f:
+                    data = zlib.decompress(f.read())
+            except FileNotFoundError:
+                return None
+            for line in data.split(b"\\0", 1)[1].split(b"\\n"):
+                if not line:
+                    break
+                if line.startswith(b"parent "):
+                    stack.append(line[len(b"parent "):].decode("ascii"))
+        return len(seen)
     
     print("\\n🐙 ИНФОРМАЦИЯ О GIT:")
     try:
@@ -310,13 +402,20 @@ def show_git_info():
         result = subprocess.run(["git", "--version"], capture_output=True, text=True)
         print(f"  Версия Git: {result.stdout.strip()}")
         
-        # Получаем текущую ветку
-        result = subprocess.run(["git", "branch", "--show-current"], capture_output=True, text=True)
-        print(f"  Текущая ветка: {result.stdout.strip()}")
-        
-        # Получаем количество коммитов
-        result = subprocess.run(["git", "rev-list", "--count", "HEAD"], capture_output=True, text=True)
-        print(f"  Количество коммитов: {result.stdout.strip()}")
+        # Текущая ветка и количество коммитов читаются из .git без запуска git
+        commits = None
+        try:
+            branch, commit = read_head()
+            commits = count_commits(commit) if commit else 0
+        except (OSError, ValueError, zlib.error):
+            result = subprocess.run(["git", "branch", "--show-current"], capture_output=True, text=True)
+            branch = result.stdout.strip() or "отсоединённый HEAD"
+        print(f"  Текущая ветка: {branch}")
+        
+        if commits is None:
+            result = subprocess.run(["git", "rev-list", "--count", "HEAD"], capture_output=True, text=True)
+            commits = result.stdout.strip()
+        print(f"  Количество коммитов: {commits}")
         
     except Exception as e:
         print(f"  Ошибка получения информации: {e}")
@@ -336,8 +435,7 @@ def show_git_info():
         )
         
         # Записываем обратно
-        with open("main.py", "w", encoding="utf-8") as f:
-            f.write(new_content)
+        file_writer.write_text(self.path("main.py"), new_content)
         
         print("✅ Добавлена функция show_git_info()")
         
@@ -372,111 +470,7 @@ def show_git_info():
         self.run_command("git branch", "Список всех веток", wait_for_user=False)
         
         # Создаем новый файл с улучшенным калькулятором
-        calculator_content = '''#!/usr/bin/env python3
-"""
-Улучшенный калькулятор - новая функция
-"""
-
-class AdvancedCalculator:
-    """Класс расширенного калькулятора"""
-    
-    def __init__(self):
-        self.history = []
-    
-    def add(self, a, b):
-        """Сложение"""
-        result = a + b
-        self.history.append(f"{a} + {b} = {result}")
-        return result
-    
-    def subtract(self, a, b):
-        """Вычитание"""
-        result = a - b
-        self.history.append(f"{a} - {b} = {result}")
-        return result
-    
-    def multiply(self, a, b):
-        """Умножение"""
-        result = a * b
-        self.history.append(f"{a} * {b} = {result}")
-        return result
-    
-    def divide(self, a, b):
-        """Деление"""
-        if b == 0:
-            raise ValueError("Деление на ноль!")
-        result = a / b
-        self.history.append(f"{a} / {b} = {result}")
-        return result
-    
-    def power(self, a, b):
-        """Возведение в степень"""
-        result = a ** b
-        self.history.append(f"{a} ^ {b} = {result}")
-        return result
-    
-    def show_history(self):
-        """Показать историю вычислений"""
-        print("\\n📊 ИСТОРИЯ ВЫЧИСЛЕНИЙ:")
-        if not self.history:
-            print("  История пуста")
-        else:
-            for i, operation in enumerate(self.history, 1):
-                print(f"  {i}. {operation}")
-
-def run_advanced_calculator():
-    """Запуск улучшенного калькулятора"""
-    print("\\n🧮 УЛУЧШЕННЫЙ КАЛЬКУЛЯТОР")
-    print("="*40)
-    
-    calc = AdvancedCalculator()
-    
-    operations = {
-        '1': ('Сложение', calc.add),
-        '2': ('Вычитание', calc.subtract),
-        '3': ('Умножение', calc.multiply),
-        '4': ('Деление', calc.divide),
-        '5': ('Степень', calc.power)
-    }
-    
-    while True:
-        print("\\nДоступные операции:")
-        for key, (name, _) in operations.items():
-            print(f"  {key}. {name}")
-        print("  6. Показать историю")
-        print("  7. Выход")
-        
-        choice = input("\\nВыберите операцию (1-7): ")
-        
-        if choice == '7':
-            print("\\n👋 Выход из калькулятора")
-            break
-            
-        elif choice == '6':
-            calc.show_history()
-            
-        elif choice in operations:
-            try:
-                a = float(input("Введите первое число: "))
-                b = float(input("Введите второе число: "))
-                
-                operation_name, operation_func = operations[choice]
-                result = operation_func(a, b)
-                
-                print(f"\\n✅ Результат {operation_name.lower()}: {result}")
-                
-            except ValueError as e:
-                print(f"\\n❌ Ошибка: {e}")
-            except Exception as e:
-                print(f"\\n❌ Неожиданная ошибка: {e}")
-        else:
-            print("\\n❌ Неверный выбор. Попробуйте снова.")
-        
-        input("\\nНажмите Enter для продолжения...")
-
-if __name__ == "__main__":
-    run_advanced_calculator()
-'''
+        calculator_content = templates.render("start_git/advanced_calculator.py")
         
         self.create_file("advanced_calculator.py", calculator_content)
         
@@ -511,71 +505,7 @@ if __name__ == "__main__":
         """Шаг 7: Создание .gitignore"""
         self.print_step(7, "СОЗДАНИЕ .gitignore ФАЙЛА")
         
-        gitignore_content = """# Файлы Python
-__pycache__/
-*.py[cod]
-*$py.class
-*.so
-.Python
-build/
-develop-eggs/
-dist/
-downloads/
-eggs/
-.eggs/
-lib/
-lib64/
-parts/
-sdist/
-var/
-wheels/
-*.egg-info/
-.installed.cfg
-*.egg
-
-# Файлы окружения
-.env
-.venv
-env/
-venv/
-ENV/
-env.bak/
-venv.bak/
-
-# Файлы IDE
-.vscode/
-.idea/
-*.swp
-*.swo
-*~
-
-# Системные файлы
-.DS_Store
-Thumbs.db
-
-# Логи и временные файлы
-*.log
-*.tmp
-*.temp
-
-# Файлы проекта
-instance/
-.webassets-cache
-
-# Файлы тестов
-.coverage
-htmlcov/
-.pytest_cache/
-.tox/
-
-# Конфигурационные файлы
-settings.ini
-config.ini
-
-# Файлы базы данных
-*.db
-*.sqlite3
-"""
+        gitignore_content = templates.render("start_git/gitignore")
         
         self.create_file(".gitignore", gitignore_content)
         
@@ -584,7 +514,7 @@ config.ini
         self.run_command('git commit -m "Добавлен .gitignore файл"', "Коммит .gitignore")
         
         # Создаем временный файл для демонстрации игнорирования
-        with open("temp_file.tmp", "w") as f:
+        with open(self.path("temp_file.tmp"), "w") as f:
             f.write("Это временный файл, который должен игнорироваться")
         
         print("\n🔍 Проверяем игнорирование файлов:")
@@ -599,7 +529,7 @@ config.ini
         print("\n⚠️  Симулируем ошибку - случайно изменяем README.md")
         
         # Делаем "случайное" изменение
-        with open("README.md", "a", encoding="utf-8") as f:
+        with open(self.path("README.md"), "a", encoding="utf-8") as f:
             f.write("\n\n---\nСЛУЧАЙНЫЙ ТЕКСТ, КОТОРЫЙ НУЖНО ОТМЕНИТЬ\n")
         
         print("\n🔍 Проверяем изменения:")
@@ -648,8 +578,7 @@ config.ini
         print(github_steps)
         
         # Создаем инструкцию в файле
-        with open("GITHUB_INSTRUCTIONS.md", "w", encoding="utf-8") as f:
-            f.write(github_steps)
+        file_writer.write_text(self.path("GITHUB_INSTRUCTIONS.md"), github_steps)
         
         print("\n📄 Инструкция сохранена в GITHUB_INSTRUCTIONS.md")
         
@@ -661,16 +590,16 @@ config.ini
         
         print("\n🎉 ПОЗДРАВЛЯЮ! ВЫ УСПЕШНО ИЗУЧИЛИ ОСНОВЫ GIT!")
         
-        # Получаем количество коммитов
-        result = subprocess.run(['git', 'rev-list', '--count', 'HEAD'], capture_output=True, text=True)
-        commit_count = result.stdout.strip()
-        
-        # Получаем количество веток
-        result = subprocess.run(['git', 'branch'], capture_output=True, text=True)
-        branch_count = len(result.stdout.strip().split('\n'))
-        
-        # Получаем количество файлов
-        file_count = len([f for f in os.listdir('.') if os.path.isfile(f)])
+        # Коммиты, ветки и файлы считаем одновременно
+        workdir = self.workdir
+        counts = async_probes.run_probes([
+            async_probes.Probe("commits", lambda: git_reader.count_commits(workdir)),
+            async_probes.Probe("branches", lambda: git_reader.count_branches(workdir)),
+            async_probes.Probe("files", lambda: inventory.count_files(workdir)),
+        ])
+        commit_count = counts["commits"]
+        branch_count = counts["branches"]
+        file_count = counts["files"]
         
         summary = f"""
 📊 РЕЗУЛЬТАТЫ ОБУЧЕНИЯ:
@@ -719,13 +648,65 @@ config.ini
         print(summary)
         
         # Сохраняем итоги в файл
-        with open("LEARNING_SUMMARY.md", "w", encoding="utf-8") as f:
-            f.write(summary)
+        file_writer.write_text(self.path("LEARNING_SUMMARY.md"), summary)
         
         print("\n📄 Итоги сохранены в LEARNING_SUMMARY.md")
         
         return True
     
+    def steps(self):
+        """Шаги курса в порядке выполнения"""
+        return [
+            self.check_git_installation,
+            self.step_1_create_repository,
+            self.step_2_create_first_files,
+            self.step_3_first_commit,
+            self.step_4_modify_files,
+            self.step_5_working_with_branches,
+            self.step_6_merge_branch,
+            self.step_7_gitignore,
+            self.step_8_undo_changes,
+            self.step_9_github_preparation,
+            self.step_10_summary
+        ]
+    
+    def checkpoint_path(self):
+        """Файл контрольной точки (рядом с папкой проекта)"""
+        return os.path.join(self.base_dir, f".{self.project_name}.checkpoint.json")
+    
+    def resume(self, progress, step_names):
+        """Сколько шагов пропустить по контрольной точке (0 - начать сначала)"""
+        start, entry = progress.resume_point(step_names)
+        if not start:
+            progress.clear()
+            return 0
+        
+        print(f"\n♻️  Найдена контрольная точка: выполнено шагов {start} из {len(step_names)}")
+        choice = self.ask("   Продолжить с места остановки? (y/n): ", default="y")
+        if choice.lower() != 'y':
+            progress.clear()
+            return 0
+        
+        self.workdir = progress.workdir
+        self.project_name = os.path.basename(self.workdir)
+        self.steps_completed = entry["steps_completed"]
+        print(f"⏭️  Пропущены шаги: {', '.join(step_names[:start])}")
+        return start
+    
+    def run_step(self, step):
+        """Выполнение одного шага с событиями before_step / after_step"""
+        measure = tracing.Measure("step", step.__name__)
+        self.hooks.emit("before_step", measure.event)
+        exit_code = None
+        try:
+            ok = step()
+            exit_code = 0 if ok else 1
+            return ok
+        finally:
+            event = measure.finish(exit_code)
+            self.step_timings.append((step.__name__, event.wall_time))
+            self.hooks.emit("after_step", event)
+    
     def run(self):
         """Запуск всего процесса обучения"""
         self.print_header("ОБУЧАЮЩИЙ КУРС ПО GIT ДЛЯ НАЧИНАЮЩИХ")
@@ -734,65 +715,136 @@ config.ini
         print("🐙 Этот курс поможет вам освоить Git на практике.")
         print(f"⏱️  Время выполнения: ~30 минут\\n")
         
-        input("Нажмите Enter чтобы начать обучение...")
+        self.ask("Нажмите Enter чтобы начать обучение...")
+        
+        profiler = None
+        if self.profile_path:
+            import cProfile
+            profiler = cProfile.Profile()
         
         try:
-            # Сохраняем исходную директорию
-            original_dir = os.getcwd()
-            
             # Запускаем все шаги
-            steps = [
-                self.check_git_installation,
-                self.step_1_create_repository,
-                self.step_2_create_first_files,
-                self.step_3_first_commit,
-                self.step_4_modify_files,
-                self.step_5_working_with_branches,
-                self.step_6_merge_branch,
-                self.step_7_gitignore,
-                self.step_8_undo_changes,
-                self.step_9_github_preparation,
-                self.step_10_summary
-            ]
-            
-            for step in steps:
-                if not step():
-                    print(f"\\n⚠️  Шаг прерван. Продолжаем...")
-            
-            # Возвращаемся в исходную директорию
-            os.chdir(original_dir)
+            if profiler:
+                profiler.enable()
+            try:
+                progress = checkpoint.Checkpoint(self.checkpoint_path())
+                steps = self.steps()
+                start = self.resume(progress, [step.__name__ for step in steps])
+                # Контрольные точки пишутся, пока все шаги проходят успешно
+                recording = True
+                for step in steps[start:]:
+                    if not self.run_step(step):
+                        recording = False
+                        print(f"\\n⚠️  Шаг прерван. Продолжаем...")
+                    elif recording and self.workdir != self.base_dir:
+                        self.flush_staged()
+                        progress.record(step.__name__, self.workdir, self.steps_completed)
+                if recording:
+                    # Курс пройден - следующий запуск начнётся сначала
+                    progress.clear()
+            finally:
+                if profiler:
+                    profiler.disable()
+                    profiler.dump_stats(self.profile_path)
+                    print(f"\\n📈 Профиль шагов сохранён в {self.profile_path}")
             
             print(f"\\n{'='*70}")
             print("✅ ОБУЧЕНИЕ ЗАВЕРШЕНО УСПЕШНО!")
             print("="*70)
             
-            print(f"\\n📁 Ваш проект находится в: {os.path.join(original_dir, self.project_name)}")
+            project_dir = os.path.join(self.base_dir, self.project_name)
+            print(f"\\n📁 Ваш проект находится в: {project_dir}")
             print("🚀 Теперь вы готовы к работе с Git в реальных проектах!")
             
-            # Запускаем тестовый скрипт проекта
-            print(f"\\n🧪 Запускаю тестовый скрипт проекта...")
-            project_path = os.path.join(original_dir, self.project_name, "main.py")
-            if os.path.exists(project_path):
-                print(f"\\n{'='*50}")
-                print("🚀 ЗАПУСК ВАШЕГО ПРОЕКТА:")
-                print("="*50)
-                os.chdir(os.path.join(original_dir, self.project_name))
-                os.system("python main.py")
+            # Запускаем тестовый скрипт проекта (у него интерактивное меню)
+            if self.interactive:
+                print(f"\\n🧪 Запускаю тестовый скрипт проекта...")
+                if os.path.exists(os.path.join(project_dir, "main.py")):
+                    print(f"\\n{'='*50}")
+                    print("🚀 ЗАПУСК ВАШЕГО ПРОЕКТА:")
+                    print("="*50)
+                    # Отдельный интерпретатор: меню читает .git/HEAD относительно папки проекта
+                    script_runner.run_script(os.path.join(project_dir, "main.py"), timeout=None,
+                               capture=False, in_process=False)
             
         except KeyboardInterrupt:
             print(f"\\n\\n⚠️  Обучение прервано пользователем.")
         except Exception as e:
             print(f"\\n❌ Произошла ошибка: {e}")
         finally:
-            input(f"\\nНажмите Enter для завершения...")
+            self.flush_staged()
+            self.close_shell()
+            self.ask(f"\\nНажмите Enter для завершения...")
+
+def command_run(git_learning, args):
+    """Весь курс"""
+    git_learning.profile_path = args.profile
+    git_learning.run()
+
+def command_step(git_learning, args):
+    """Один шаг курса в уже созданном проекте"""
+    steps = git_learning.steps()
+    names = [step.__name__ for step in steps]
+    if args.step.isdigit() and int(args.step) < len(steps):
+        step = steps[int(args.step)]
+    elif args.step in names:
+        step = steps[names.index(args.step)]
+    else:
+        print(f"❌ Неизвестный шаг: {args.step} (см. --list-steps)")
+        return
+    
+    project_dir = os.path.join(git_learning.base_dir, git_learning.project_name)
+    if os.path.isdir(project_dir):
+        git_learning.workdir = project_dir
+    elif step not in steps[:2]:
+        print(f"❌ Папка проекта не найдена: {project_dir}. Сначала выполните шаг 1.")
+        return
+    
+    try:
+        git_learning.run_step(step)
+    finally:
+        git_learning.flush_staged()
+        git_learning.close_shell()
+
+def command_list_steps(git_learning, args):
+    """Список шагов курса"""
+    for number, step in enumerate(git_learning.steps()):
+        print(f"{number:>3}. {step.__name__:<32} {step.__doc__.strip()}")
+
+# Команды командной строки: флаг -> функция (без флага - весь курс)
+COMMANDS = {
+    "list_steps": command_list_steps,
+    "step": command_step,
+}
 
 def main():
     """Точка входа"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Обучающий курс по Git")
+    parser.add_argument("--headless", action="store_true",
+                        help="выполнить все шаги без вопросов и ожидания Enter")
+    parser.add_argument("--project", default="my_learning_project", help="имя папки проекта")
+    parser.add_argument("--step", help="выполнить только один шаг (номер или имя)")
+    parser.add_argument("--list-steps", action="store_true", help="показать шаги курса")
+    parser.add_argument("--trace", help="записать шаги и команды в файл Chrome trace (JSON)")
+    parser.add_argument("--profile", help="сохранить профиль cProfile шагов курса")
+    args = parser.parse_args()
+    
     # Создаем экземпляр класса обучения
-    git_learning = GitLearning()
+    git_learning = GitLearning(project_name=args.project, interactive=not args.headless)
+    command = next((func for name, func in COMMANDS.items() if getattr(args, name)), command_run)
     
-    # Запускаем обучение
-    git_learning.run()
+    collector = None
+    if args.trace:
+        collector = tracing.TraceCollector().attach(git_learning.hooks)
+    
+    try:
+        command(git_learning, args)
+    finally:
+        if collector:
+            collector.save(args.trace)
+            print(f"📄 Трасса сохранена в {args.trace}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Шаблоны файлов учебных проектов
+Тексты файлов лежат в папке templates/ (формат string.Template: $date -
+подстановка, $$ - знак доллара). Строка "#include shared/имя" заменяется
+текстом другого шаблона: общий код учебных проектов хранится в одном
+месте. Каждый шаблон читается и разбирается один раз за процесс, а
+scaffold записывает несколько файлов проекта одновременно через общий
+пул потоков.
+"""
+import functools
+import os
+import string
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from file_writer import write_text
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+# Строка шаблона, которая заменяется текстом другого шаблона
+INCLUDE = "#include "
+# Потоков для записи файлов проекта
+SCAFFOLD_WORKERS = 4
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _read(name):
+    """Текст шаблона с подставленными #include"""
+    path = os.path.join(TEMPLATE_DIR, *name.split("/")) + ".tmpl"
+    with open(path, "r", encoding="utf-8") as f:
+        lines = f.readlines()
+    return "".join(_read(line[len(INCLUDE):].strip()) if line.startswith(INCLUDE) else line
+                   for line in lines)
+
+
+@functools.lru_cache(maxsize=None)
+def load(name):
+    """Шаблон по имени, например "start_git/main.py" (файл start_git/main.py.tmpl)"""
+    return string.Template(_read(name))
+
+
+@functools.lru_cache(maxsize=None)
+def _static(name):
+    """Текст шаблона без подстановок (вычисляется один раз)"""
+    return load(name).substitute()
+
+
+def render(name, **values):
+    """Текст файла по шаблону"""
+    if not values:
+        return _static(name)
+    return load(name).substitute(values)
+
+
+def _executor():
+    """Общий пул потоков (создаётся при первой записи)"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=SCAFFOLD_WORKERS, thread_name_prefix="scaffold")
+        return _pool
+
+
+def _write(path, name, values):
+    return write_text(path, render(name, **values))
+
+
+def scaffold(project_dir, files, **values):
+    """
+    Записать файлы проекта одновременно
+    files - {имя файла в проекте: имя шаблона}; values - подстановки для
+    шаблонов. Возвращает {имя файла: True, если файл был записан}.
+    """
+    pool = _executor()
+    jobs = {}
+    for filename, name in files.items():
+        needed = {key: value for key, value in values.items() if key in _placeholders(name)}
+        jobs[filename] = pool.submit(_write, os.path.join(project_dir, filename), name, needed)
+    return {filename: job.result() for filename, job in jobs.items()}
+
+
+@functools.lru_cache(maxsize=None)
+def _placeholders(name):
+    """Имена подстановок шаблона"""
+    template = load(name)
+    return frozenset(
+        match.group("named") or match.group("braced")
+        for match in template.pattern.finditer(template.template)
+        if match.group("named") or match.group("braced")
+    )
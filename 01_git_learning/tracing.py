@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+События шагов и команд обучающего курса
+Hooks - список обработчиков для событий before_step, after_step,
+before_command и after_command. TraceCollector собирает события в файл
+формата Chrome trace (открывается в chrome://tracing или ui.perfetto.dev).
+"""
+import os
+import threading
+import time
+from collections import namedtuple
+
+HOOK_NAMES = ("before_step", "after_step", "before_command", "after_command")
+
+# started - time.perf_counter() в начале; время в секундах
+# cpu_time - CPU процесса и его завершённых дочерних процессов (git и т.п.)
+# exit_code - код завершения (None, если он неизвестен или было исключение)
+HookEvent = namedtuple(
+    "HookEvent", "kind name started wall_time cpu_time exit_code output_bytes",
+    defaults=(0.0, 0.0, None, 0),
+)
+
+
+class Hooks:
+    """Обработчики событий: {имя события: [функция(event), ...]}"""
+
+    def __init__(self):
+        self.callbacks = {name: [] for name in HOOK_NAMES}
+
+    def add(self, name, callback):
+        """Подписать функцию на событие"""
+        if name not in self.callbacks:
+            raise ValueError(f"Неизвестное событие: {name}")
+        self.callbacks[name].append(callback)
+
+    def remove(self, name, callback):
+        self.callbacks[name].remove(callback)
+
+    def emit(self, name, event):
+        for callback in self.callbacks[name]:
+            callback(event)
+
+
+def cpu_seconds():
+    """
+    CPU процесса вместе с дочерними процессами, которые уже завершились
+    Команды, выполненные в долгоживущей оболочке, попадут сюда только после
+    её закрытия; на Windows дочерние процессы не учитываются (os.times).
+    """
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+
+class Measure:
+    """Замер времени и CPU между созданием и finish()"""
+
+    def __init__(self, kind, name):
+        self.kind = kind
+        self.name = name
+        self.started = time.perf_counter()
+        self._cpu_started = cpu_seconds()
+
+    @property
+    def event(self):
+        """Событие начала"""
+        return HookEvent(self.kind, self.name, self.started)
+
+    def finish(self, exit_code=None, output_bytes=0):
+        """Событие завершения"""
+        return HookEvent(
+            self.kind, self.name, self.started,
+            time.perf_counter() - self.started,
+            cpu_seconds() - self._cpu_started,
+            exit_code, output_bytes,
+        )
+
+
+class TraceCollector:
+    """Запись шагов и команд в файл Chrome trace"""
+
+    def __init__(self):
+        self.events = []
+        self.pid = os.getpid()
+        self._lock = threading.Lock()
+
+    def attach(self, hooks):
+        """Подписаться на завершение шагов и команд"""
+        hooks.add("after_step", self.on_event)
+        hooks.add("after_command", self.on_event)
+        return self
+
+    def on_event(self, event):
+        record = {
+            "name": event.name,
+            "cat": event.kind,
+            "ph": "X",
+            "ts": event.started * 1_000_000,
+            "dur": event.wall_time * 1_000_000,
+            "pid": self.pid,
+            "tid": threading.get_ident(),
+            "args": {
+                "cpu_ms": round(event.cpu_time * 1000, 3),
+                "exit_code": event.exit_code,
+                "output_bytes": event.output_bytes,
+            },
+        }
+        with self._lock:
+            self.events.append(record)
+
+    def save(self, path):
+        """Сохранить трассу в JSON"""
+        import json
+        with self._lock:
+            trace = {"traceEvents": list(self.events), "displayTimeUnit": "ms"}
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(trace, f, ensure_ascii=False)